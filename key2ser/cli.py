@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import logging
 from pathlib import Path
 import sys
@@ -8,7 +9,22 @@ import sys
 from key2ser.config import DEFAULT_CONFIG_PATH, load_config
 
 
+logger = logging.getLogger(__name__)
+
+# evdev を利用できない Windows 系の sys.platform 値。
+_UNSUPPORTED_PLATFORMS = frozenset({"win32", "cygwin"})
+
+# --log-level で受け付けるログレベル名。
+_LOG_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
 # CLIの引数パーサを組み立てる。
+@functools.lru_cache(maxsize=1)
 def _build_parser() -> argparse.ArgumentParser:
     """コマンドライン引数の構造を定義したパーサを返す。"""
     parser = argparse.ArgumentParser(description="HID入力を仮想シリアルへ送信します。")
@@ -30,7 +46,7 @@ def _build_parser() -> argparse.ArgumentParser:
 # サポート外プラットフォーム向けの警告文を生成する。
 def _unsupported_platform_message(platform: str) -> str | None:
     """実行環境が非対応の場合に表示するメッセージを返す。"""
-    if platform.startswith("win"):
+    if platform in _UNSUPPORTED_PLATFORMS:
         return "Windows では対応していません。Linux (evdev) 環境で実行してください。"
     return None
 
@@ -38,13 +54,51 @@ def _unsupported_platform_message(platform: str) -> str | None:
 # ログレベルの指定を検証して実際のレベル値に変換する。
 def _resolve_log_level(value: str) -> tuple[int, str | None]:
     """ログレベルを解決し、必要なら警告メッセージを返す。"""
-    normalized = str(value).upper()
-    resolved = logging.getLevelName(normalized)
-    if isinstance(resolved, int):
+    resolved = _LOG_LEVELS.get(str(value).upper())
+    if resolved is not None:
         return resolved, None
     return logging.INFO, f"未対応のログレベル {value} が指定されたため INFO にフォールバックします。"
 
 
+# CLI実行時のみルートロガーを初期化する。
+def _configure_logging(level: int) -> None:
+    """ルートロガーが未設定の場合に限りハンドラを設定する。"""
+    # 組み込み利用や繰り返し呼び出しで既存のハンドラ設定を上書きしないようにする。
+    if logging.getLogger().handlers:
+        return
+    logging.basicConfig(
+        level=level,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+
+
+# 例外型ごとの終了コード表を生成する。
+@functools.lru_cache(maxsize=1)
+def _error_exit_codes() -> dict[type[BaseException], int]:
+    """runnerの例外型を含む終了コード表を初回のみ組み立てて返す。"""
+    from key2ser import runner
+
+    return {
+        FileNotFoundError: 2,
+        runner.DeviceNotFoundError: 3,
+        runner.DeviceAccessError: 3,
+        runner.SerialConnectionError: 5,
+        ValueError: 4,
+    }
+
+
+# 例外に対応する終了コードを解決する。
+def _resolve_exit_code(exc: BaseException) -> int | None:
+    """例外型のMROを辿り、最初に一致した終了コードを返す。"""
+    exit_codes = _error_exit_codes()
+    # 派生クラスでも基底クラスの終了コードを引けるよう、MRO順に表を参照する。
+    for error_type in type(exc).__mro__:
+        exit_code = exit_codes.get(error_type)
+        if exit_code is not None:
+            return exit_code
+    return None
+
+
 # エントリポイントとして設定読み込みとイベントループを起動する。
 def main(argv: list[str] | None = None) -> int:
     """CLI起動時の設定読み込みと実行処理を行う。"""
@@ -52,17 +106,14 @@ def main(argv: list[str] | None = None) -> int:
     args = parser.parse_args(argv)
 
     log_level, warning_message = _resolve_log_level(args.log_level)
-    logging.basicConfig(
-        level=log_level,
-        format="%(asctime)s %(levelname)s %(message)s",
-    )
+    _configure_logging(log_level)
     if warning_message is not None:
-        logging.warning("%s", warning_message)
+        logger.warning("%s", warning_message)
 
     # 非対応プラットフォームでは実行を止めて明示的に終了する。
     platform_message = _unsupported_platform_message(sys.platform)
     if platform_message is not None:
-        logging.error("%s", platform_message)
+        logger.error("%s", platform_message)
         return 1
 
     from key2ser import runner
@@ -73,23 +124,15 @@ def main(argv: list[str] | None = None) -> int:
         return 0
 
     except KeyboardInterrupt:
-        logging.info("終了します。")
+        logger.info("終了します。")
         return 0
 
-
     except Exception as exc:
-        error_exit_codes = {
-            FileNotFoundError: 2,
-            runner.DeviceNotFoundError: 3,
-            runner.DeviceAccessError: 3,
-            runner.SerialConnectionError: 5,
-            ValueError: 4,
-        }
-        for error_type, exit_code in error_exit_codes.items():
-            if isinstance(exc, error_type):
-                logging.error("%s", exc)
-                return exit_code
-        raise
+        exit_code = _resolve_exit_code(exc)
+        if exit_code is None:
+            raise
+        logger.error("%s", exc)
+        return exit_code
 
 if __name__ == "__main__":
     raise SystemExit(main())
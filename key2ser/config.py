@@ -2,27 +2,28 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import codecs
-import configparser
+import functools
+import hashlib
 import logging
 from pathlib import Path
 import re
-from typing import Optional
+import sys
+from typing import Any, Callable, Optional
 
-from evdev import ecodes
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class InputConfig:
     mode: str
     device: Optional[str]
     vendor_id: Optional[int]
     product_id: Optional[int]
     device_name_contains: Optional[str]
-    prefer_event_has_keys: tuple[str, ...]
+    prefer_event_has_keys: frozenset[str]
     grab: bool
     reconnect_interval_seconds: float
     
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SerialConfig:
     port: str
     baudrate: int
@@ -43,20 +44,20 @@ class SerialConfig:
     pty_mode: Optional[int]
     pty_group: Optional[str]
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class OutputConfig:
     encoding: str
     encoding_errors: str
     line_end: str
     line_end_mode: str
-    terminator_keys: tuple[str, ...]
+    terminator_keys: frozenset[str]
     send_on_enter: bool
     send_mode: str
     idle_timeout_seconds: float
     dedup_window_seconds: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AppConfig:
     input: InputConfig
     serial: SerialConfig
@@ -64,73 +65,161 @@ class AppConfig:
 
 
 DEFAULT_CONFIG_PATH = Path("config.ini")
-DEFAULT_PREFERRED_INPUT_KEYS = (
-    "KEY_ENTER",
-    "KEY_KPENTER",
-    *tuple(f"KEY_{digit}" for digit in range(10)),
+_OCTAL_RE = re.compile(r"[0-7]+")
+# キー一覧はイベント処理で所属判定に使うため frozenset で保持する。
+DEFAULT_PREFERRED_INPUT_KEYS = frozenset(
+    {
+        "KEY_ENTER",
+        "KEY_KPENTER",
+        *(f"KEY_{digit}" for digit in range(10)),
+    }
+)
+DEFAULT_TERMINATOR_KEYS = frozenset({"KEY_ENTER", "KEY_KPENTER"})
+REQUIRED_SECTIONS = ("input", "serial", "output")
+_VALID_LINE_END_MODES = frozenset({"literal", "escape"})
+_VALID_SEND_MODES = frozenset({"on_enter", "per_char", "idle_timeout"})
+_VALID_BYTESIZES = frozenset({5, 6, 7, 8})
+_VALID_STOPBITS = frozenset({1.0, 1.5, 2.0})
+_VALID_ENCODING_ERRORS = frozenset(
+    {
+        "strict",
+        "replace",
+        "ignore",
+        "backslashreplace",
+        "xmlcharrefreplace",
+        "namereplace",
+    }
 )
-DEFAULT_TERMINATOR_KEYS = ("KEY_ENTER", "KEY_KPENTER")
+# パリティは1文字表記が一般的なため、1文字用と単語用の表を分けて引く。
+_PARITY_CHAR_MAP = {"n": "N", "e": "E", "o": "O", "m": "M", "s": "S"}
+_PARITY_WORD_MAP = {"none": "N", "even": "E", "odd": "O", "mark": "M", "space": "S"}
+
+# configparser と同じ真偽値表記を受け付ける。
+_BOOL_TRUE = frozenset({"1", "yes", "true", "on"})
+_BOOL_FALSE = frozenset({"0", "no", "false", "off"})
+
+# パスごとに直近の内容のハッシュと解析結果を保持するキャッシュ（挿入順で古いものから捨てる）。
+# 別パスの同一内容では再利用せず、未知キーの警告などファイルごとの検証を省かない。
+_CONFIG_BY_PATH: dict[str, tuple[bytes, AppConfig]] = {}
+_CONFIG_BY_PATH_MAXSIZE = 8
 
 logger = logging.getLogger(__name__)
 
-# 任意指定の数値項目をintに変換する。
-def _parse_optional_int(value: Optional[str], *, field_name: str) -> Optional[int]:
-    """空文字やNoneを許容しつつ数値をパースする。"""
-    if value is None:
-        return None
-    value = value.strip()
-    if not value:
-        return None
-    try:
-        return int(value, 0)
-    except ValueError as exc:
-        raise ValueError(f"{field_name} must be integer (decimal or hex)") from exc
+
+class _UnsupportedIniSyntax(ValueError):
+    """高速パーサーが扱わないINI構文を検出したことを表す。"""
+
+
+# VID/PIDなどの整数文字列をintに変換する。
+def _to_int(value: str) -> int:
+    """0x付き16進か10進の文字列を整数に変換する。"""
+    # VID/PIDはほぼ10進か0x付き16進のため、int(value, 0) の基数自動判定は最後の手段にする。
+    # 先頭0の複数桁は int(value, 0) と同じく曖昧な8進表記として拒否するため、高速経路に載せない。
+    if value.isdigit() and (value[0] != "0" or len(value) == 1):
+        return int(value)
+    if value[:2] in ("0x", "0X"):
+        return int(value, 16)
+    return int(value, 0)
+
+
+# 8進数のパーミッション文字列をintに変換する。
+def _to_octal(value: str) -> int:
+    """0-7 の数字のみで書かれた文字列を8進数として変換する。"""
+    if not _OCTAL_RE.fullmatch(value):
+        raise ValueError(value)
+    return int(value, 8)
 
 
-# 任意指定の数値項目をfloatに変換する。
-def _parse_optional_float(value: Optional[str], *, field_name: str) -> Optional[float]:
-    """空文字やNoneを許容しつつ小数値をパースする。"""
+# 任意指定の数値項目の変換関数と、失敗時のメッセージ書式の対応表。
+_COERCERS: dict[str, tuple[Callable[[str], Any], str]] = {
+    "int": (_to_int, "{field_name} must be integer (decimal or hex)"),
+    "float": (float, "{field_name} must be float"),
+    "octal": (_to_octal, "{field_name} は 0-7 の数字のみで指定してください。"),
+}
+
+
+# 任意指定の数値項目を種類に応じて変換する。
+def _coerce(value: Optional[str], kind: str, *, field_name: str) -> Optional[Any]:
+    """空文字やNoneを許容しつつ、_COERCERS の変換関数で値をパースする。"""
     if value is None:
         return None
     value = value.strip()
     if not value:
         return None
+    convert, message = _COERCERS[kind]
     try:
-        return float(value)
+        return convert(value)
     except ValueError as exc:
-        raise ValueError(f"{field_name} must be float") from exc
+        raise ValueError(message.format(field_name=field_name)) from exc
+
+
+# 0以上であることを検証する。
+def _require_non_negative(value: float, *, field_name: str) -> float:
+    """負の値なら設定項目名付きのエラーを送出する。"""
+    if value < 0:
+        raise ValueError(f"{field_name} は 0 以上の値を指定してください。")
+    return value
+
+
+# 1以上であることを検証する。
+def _require_positive(value: int, *, field_name: str) -> int:
+    """0以下の値なら設定項目名付きのエラーを送出する。"""
+    if value <= 0:
+        raise ValueError(f"{field_name} は 1 以上の値を指定してください。")
+    return value
+
+
+# 真偽値の文字列を変換する。
+def _parse_bool(value: str, *, field_name: str) -> bool:
+    """configparser互換の表記で真偽値をパースする。"""
+    normalized = value.strip().lower()
+    if normalized in _BOOL_TRUE:
+        return True
+    if normalized in _BOOL_FALSE:
+        return False
+    raise ValueError(f"{field_name} must be boolean (true/false)")
 
 
 # 任意指定の真偽値を取得する。
-def _parse_optional_bool(
-    parser: configparser.ConfigParser,
-    section: str,
-    option: str,
-) -> Optional[bool]:
+def _parse_optional_bool(section: dict[str, str], option: str, *, field_name: str) -> Optional[bool]:
     """指定されていない場合はNoneを返す。"""
-    if not parser.has_option(section, option):
-        return None
-    value = parser.get(section, option, fallback=None)
+    value = section.get(option)
     if value is None:
         return None
     # 空文字は未指定として扱い、既存の設定ファイルの落とし穴を回避する。
     if not value.strip():
         return None
-    return parser.getboolean(section, option)
+    return _parse_bool(value, field_name=field_name)
 
 
 # 真偽値の設定をデフォルト込みで取得する。
-def _get_bool(parser: configparser.ConfigParser, section: str, option: str, default: bool) -> bool:
+def _get_bool(section: dict[str, str], option: str, default: bool, *, field_name: str) -> bool:
     """存在しない設定項目に対して既定値を返す。"""
-    if not parser.has_option(section, option):
+    value = section.get(option)
+    if value is None:
         return default
-    return parser.getboolean(section, option)
+    return _parse_bool(value, field_name=field_name)
+
+
+# 文字列の設定を前後の空白を除いて取得する。
+def _get_str(section: dict[str, str], option: str, default: str) -> str:
+    """存在しない設定項目には既定値を使い、前後の空白を取り除いて返す。"""
+    return section.get(option, default).strip()
+
+
+# 任意指定の文字列設定を取得する。
+def _get_optional_str(section: dict[str, str], option: str) -> Optional[str]:
+    """未指定や空文字の場合は None を返す。"""
+    value = section.get(option)
+    if value is None:
+        return None
+    return value.strip() or None
 
 
 # シリアルのデータビットをパースする。
 def _parse_bytesize(value: int) -> int:
     """シリアルのデータビット設定を検証する。"""
-    if value not in {5, 6, 7, 8}:
+    if value not in _VALID_BYTESIZES:
         raise ValueError("serial.bytesize は 5/6/7/8 のいずれかを指定してください。")
     return value
 
@@ -139,21 +228,13 @@ def _parse_bytesize(value: int) -> int:
 def _parse_parity(value: str) -> str:
     """パリティ設定を正規化して返す。"""
     normalized = value.strip().lower()
-    mapping = {
-        "n": "N",
-        "none": "N",
-        "e": "E",
-        "even": "E",
-        "o": "O",
-        "odd": "O",
-        "m": "M",
-        "mark": "M",
-        "s": "S",
-        "space": "S",
-    }
-    if normalized not in mapping:
+    if len(normalized) == 1:
+        parity = _PARITY_CHAR_MAP.get(normalized)
+    else:
+        parity = _PARITY_WORD_MAP.get(normalized)
+    if parity is None:
         raise ValueError("serial.parity は none/odd/even/mark/space のいずれかを指定してください。")
-    return mapping[normalized]
+    return parity
 
 
 # シリアルのストップビットをパースする。
@@ -163,37 +244,29 @@ def _parse_stopbits(value: str) -> float:
         stopbits = float(value)
     except ValueError as exc:
         raise ValueError("serial.stopbits は 1/1.5/2 のいずれかを指定してください。") from exc
-    if stopbits not in {1.0, 1.5, 2.0}:
+    if stopbits not in _VALID_STOPBITS:
         raise ValueError("serial.stopbits は 1/1.5/2 のいずれかを指定してください。")
     return stopbits
 
 
-# PTYのパーミッションをパースする。
-def _parse_optional_mode(value: Optional[str]) -> Optional[int]:
-    """PTYのパーミッションを数値に変換する。"""
-    if value is None:
-        return None
-    normalized = value.strip()
-    if not normalized:
-        return None
-    if not re.fullmatch(r"[0-7]+", normalized):
-        raise ValueError("serial.pty_mode は 0-7 の数字のみで指定してください。")
-    return int(normalized, 8)
-
-
 # 改行コードのエスケープ解釈を行う。
-def _parse_line_end(line_end: str, *, line_end_mode: str) -> str:
+@functools.lru_cache(maxsize=32)
+def _parse_line_end(line_end: str, line_end_mode: str) -> str:
     """改行モードに応じてエスケープ変換を適用する。"""
     if line_end_mode == "literal":
         return line_end
     try:
-        return bytes(line_end, "utf-8").decode("unicode_escape")
+        return codecs.decode(line_end, "unicode_escape")
     except UnicodeDecodeError as exc:
         raise ValueError("output.line_end に無効なエスケープシーケンスがあります。") from exc
 
+
 # カンマ区切りのキー一覧をパースする。
 def _warn_unknown_keys(keys: list[str], *, field_name: str) -> None:
     """未知のキーコードが含まれる場合に警告を出す。"""
+    # CLIの --help などでevdevを読み込まずに済むよう、キー検証時まで遅延importする。
+    from evdev import ecodes
+
     unknown = [key for key in keys if not hasattr(ecodes, key)]
     if not unknown:
         return
@@ -208,163 +281,280 @@ def _warn_unknown_keys(keys: list[str], *, field_name: str) -> None:
 def _parse_key_list(
     value: Optional[str],
     *,
-    default: Optional[tuple[str, ...]],
+    default: Optional[frozenset[str]],
     field_name: str,
-) -> tuple[str, ...]:
-    """キーコードのリスト設定を正規化して返す。"""
+) -> frozenset[str]:
+    """キーコードのリスト設定を正規化し、重複を除いた集合で返す。"""
     if value is None:
-        return default or tuple()
-    stripped = value.strip()
-    if not stripped:
-        return tuple()
-    keys = [item.strip().upper() for item in stripped.split(",") if item.strip()]
+        return default or frozenset()
+    # 各要素のstripは1回だけにし、空要素はその場で読み飛ばす。
+    keys: list[str] = []
+    for item in value.split(","):
+        item = item.strip()
+        if item:
+            keys.append(item.upper())
+    if not keys:
+        return frozenset()
     _warn_unknown_keys(keys, field_name=field_name)
-    return tuple(keys)
-
+    # キー名はイベント処理で繰り返し比較されるため intern しておく。
+    return frozenset(sys.intern(key) for key in keys)
+
+
+# INI形式の行から区切り文字の位置を求める。
+def _find_delimiter(line: str) -> int:
+    """configparserと同様に '=' と ':' のうち先に現れる位置を返す。"""
+    equals = line.find("=")
+    colon = line.find(":")
+    if colon < 0 or 0 <= equals < colon:
+        return equals
+    return colon
+
+
+# INI形式のテキストをセクションごとの辞書に変換する。
+def _parse_ini(text: str) -> dict[str, dict[str, str]]:
+    """config.ini を1パスで読み取り、セクション名をキーにした辞書を返す。"""
+    # configparserは取得のたびに補間や正規化を行うため、固定スキーマの設定は1度の走査で辞書化する。
+    sections: dict[str, dict[str, str]] = {}
+    current: Optional[dict[str, str]] = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped[0] in "#;":
+            continue
+        if line[0] in " \t":
+            # 継続行はconfigparserでの読み直しに任せる。
+            raise _UnsupportedIniSyntax("config.ini の読み取りに失敗しました。")
+        if stripped[0] == "[":
+            name = stripped[1:-1]
+            if stripped[-1] != "]" or not name:
+                # 末尾コメント付きの見出しなどはconfigparserでの読み直しに任せる。
+                raise _UnsupportedIniSyntax("config.ini の読み取りに失敗しました。")
+            if name in sections:
+                raise ValueError("config.ini の読み取りに失敗しました。")
+            current = sections[name] = {}
+            continue
+        delimiter = _find_delimiter(stripped)
+        if current is None or delimiter <= 0:
+            raise ValueError("config.ini の読み取りに失敗しました。")
+        key = stripped[:delimiter].strip().lower()
+        value = stripped[delimiter + 1 :].strip()
+        if not key or key in current:
+            raise ValueError("config.ini の読み取りに失敗しました。")
+        if "%" in value:
+            # 補間構文はconfigparserでの読み直しに任せる。
+            raise _UnsupportedIniSyntax("config.ini の読み取りに失敗しました。")
+        current[key] = value
+    # DEFAULTセクションの値は各セクションの既定値として扱う。
+    defaults = sections.pop("DEFAULT", {})
+    if defaults:
+        sections = {name: {**defaults, **values} for name, values in sections.items()}
+    return sections
+
+
+# 高速パーサーが扱えないINIをconfigparserで読み取る。
+def _parse_ini_with_configparser(text: str) -> dict[str, dict[str, str]]:
+    """継続行や補間を含む config.ini を configparser で辞書に変換する。"""
+    # 通常の設定では不要なため、configparserは必要になった時点で読み込む。
+    import configparser
 
-# 設定ファイルを読み込んでアプリ設定に変換する。
-def load_config(path: Path) -> AppConfig:
-    """config.ini を検証しながら AppConfig に変換する。"""
     parser = configparser.ConfigParser()
-    if not path.exists():
-        raise FileNotFoundError(f"config file not found: {path}")
     try:
-        parser.read(path)
-    except (configparser.Error, OSError, UnicodeDecodeError) as exc:
+        parser.read_string(text)
+        return {name: dict(parser.items(name)) for name in parser.sections()}
+    except configparser.Error as exc:
         raise ValueError("config.ini の読み取りに失敗しました。") from exc
 
-    # 必須セクションが揃っているかを最初に確認する。
-    required_sections = {"input", "serial", "output"}
-    missing_sections = sorted(required_sections - set(parser.sections()))
-    if missing_sections:
-        missing_labels = ", ".join(missing_sections)
-        raise ValueError(f"config.ini に必要なセクションがありません: {missing_labels}")
 
+# 入力設定を構築する。
+def _build_input(section: dict[str, str]) -> InputConfig:
+    """[input] セクションを検証して InputConfig を返す。"""
     # 入力デバイスの指定は名前優先だがVID/PIDにも対応する。
-    mode = parser.get("input", "mode", fallback="evdev").strip()
+    mode = _get_str(section, "mode", "evdev")
     if mode != "evdev":
         raise ValueError("input.mode は evdev のみサポートしています。")
-    device = parser.get("input", "device", fallback="").strip() or None
-    vendor_id = _parse_optional_int(parser.get("input", "vendor_id", fallback=None), field_name="vendor_id")
-    product_id = _parse_optional_int(parser.get("input", "product_id", fallback=None), field_name="product_id")
+    device = _get_optional_str(section, "device")
+    vendor_id = _coerce(section.get("vendor_id"), "int", field_name="vendor_id")
+    product_id = _coerce(section.get("product_id"), "int", field_name="product_id")
     if (vendor_id is None) ^ (product_id is None):
         raise ValueError("input.vendor_id と input.product_id は両方指定してください。")
-    device_name_contains = parser.get("input", "device_name_contains", fallback="").strip() or None
+    device_name_contains = _get_optional_str(section, "device_name_contains")
     prefer_event_has_keys = _parse_key_list(
-        parser.get("input", "prefer_event_has_keys", fallback=None),
+        section.get("prefer_event_has_keys"),
         default=DEFAULT_PREFERRED_INPUT_KEYS,
         field_name="input.prefer_event_has_keys",
     )
-    grab = _get_bool(parser, "input", "grab", False)
-    reconnect_interval_seconds = parser.getfloat("input", "reconnect_interval_seconds", fallback=3.0)
-    if reconnect_interval_seconds < 0:
-        raise ValueError("input.reconnect_interval_seconds は 0 以上の値を指定してください。")
+    grab = _get_bool(section, "grab", False, field_name="input.grab")
+    reconnect_interval_seconds = _require_non_negative(
+        float(section.get("reconnect_interval_seconds", "3.0")),
+        field_name="input.reconnect_interval_seconds",
+    )
 
-    port = parser.get("serial", "port", fallback="").strip()
+    return InputConfig(
+        mode=mode,
+        device=device,
+        vendor_id=vendor_id,
+        product_id=product_id,
+        device_name_contains=device_name_contains,
+        prefer_event_has_keys=prefer_event_has_keys,
+        grab=grab,
+        reconnect_interval_seconds=reconnect_interval_seconds,
+    )
+
+
+# シリアル設定を構築する。
+def _build_serial(section: dict[str, str]) -> SerialConfig:
+    """[serial] セクションを検証して SerialConfig を返す。"""
+    port = _get_str(section, "port", "")
     if not port:
         raise ValueError("serial.port is required")
-    baudrate = parser.getint("serial", "baudrate", fallback=9600)
-    if baudrate <= 0:
-        raise ValueError("serial.baudrate は 1 以上の値を指定してください。")
-    timeout = parser.getfloat("serial", "timeout", fallback=1.0)
-    write_timeout = _parse_optional_float(parser.get("serial", "write_timeout", fallback=None), field_name="write_timeout")
-    if write_timeout is not None and write_timeout < 0:
-        raise ValueError("serial.write_timeout は 0 以上の値を指定してください。")
-    bytesize = _parse_bytesize(parser.getint("serial", "bytesize", fallback=8))
-    parity = _parse_parity(parser.get("serial", "parity", fallback="none"))
-    stopbits = _parse_stopbits(parser.get("serial", "stopbits", fallback="1"))
-    xonxoff = _get_bool(parser, "serial", "xonxoff", False)
-    rtscts = _get_bool(parser, "serial", "rtscts", False)
-    dsrdtr = _get_bool(parser, "serial", "dsrdtr", False)
-    exclusive = _parse_optional_bool(parser, "serial", "exclusive")
-    emulate_modem_signals = _get_bool(parser, "serial", "emulate_modem_signals", False)
-    dtr = _parse_optional_bool(parser, "serial", "dtr")
-    rts = _parse_optional_bool(parser, "serial", "rts")
-    emulate_timing = _get_bool(parser, "serial", "emulate_timing", False)
-    pty_link = parser.get("serial", "pty_link", fallback="").strip() or None
-    pty_mode = _parse_optional_mode(parser.get("serial", "pty_mode", fallback=None))
-    pty_group = parser.get("serial", "pty_group", fallback="").strip() or None
-   
+    baudrate = _require_positive(int(section.get("baudrate", "9600")), field_name="serial.baudrate")
+    timeout = float(section.get("timeout", "1.0"))
+    write_timeout = _coerce(section.get("write_timeout"), "float", field_name="write_timeout")
+    if write_timeout is not None:
+        _require_non_negative(write_timeout, field_name="serial.write_timeout")
+    bytesize = _parse_bytesize(int(section.get("bytesize", "8")))
+    parity = _parse_parity(section.get("parity", "none"))
+    stopbits = _parse_stopbits(section.get("stopbits", "1"))
+    xonxoff = _get_bool(section, "xonxoff", False, field_name="serial.xonxoff")
+    rtscts = _get_bool(section, "rtscts", False, field_name="serial.rtscts")
+    dsrdtr = _get_bool(section, "dsrdtr", False, field_name="serial.dsrdtr")
+    exclusive = _parse_optional_bool(section, "exclusive", field_name="serial.exclusive")
+    emulate_modem_signals = _get_bool(section, "emulate_modem_signals", False, field_name="serial.emulate_modem_signals")
+    dtr = _parse_optional_bool(section, "dtr", field_name="serial.dtr")
+    rts = _parse_optional_bool(section, "rts", field_name="serial.rts")
+    emulate_timing = _get_bool(section, "emulate_timing", False, field_name="serial.emulate_timing")
+    pty_link = _get_optional_str(section, "pty_link")
+    pty_mode = _coerce(section.get("pty_mode"), "octal", field_name="serial.pty_mode")
+    pty_group = _get_optional_str(section, "pty_group")
+
+    return SerialConfig(
+        port=port,
+        baudrate=baudrate,
+        timeout=timeout,
+        write_timeout=write_timeout,
+        bytesize=bytesize,
+        parity=parity,
+        stopbits=stopbits,
+        xonxoff=xonxoff,
+        rtscts=rtscts,
+        dsrdtr=dsrdtr,
+        exclusive=exclusive,
+        emulate_modem_signals=emulate_modem_signals,
+        dtr=dtr,
+        rts=rts,
+        emulate_timing=emulate_timing,
+        pty_link=pty_link,
+        pty_mode=pty_mode,
+        pty_group=pty_group,
+    )
+
+
+# 出力設定を構築する。
+def _build_output(section: dict[str, str]) -> OutputConfig:
+    """[output] セクションを検証して OutputConfig を返す。"""
     # 送信方式に応じて改行や送信トリガーを決める。
-    encoding = parser.get("output", "encoding", fallback="utf-8").strip()
+    # 出力設定の識別子は送信処理で繰り返し比較されるため intern しておく。
+    encoding = sys.intern(_get_str(section, "encoding", "utf-8"))
     try:
         codecs.lookup(encoding)
     except LookupError as exc:
         raise ValueError("output.encoding に未対応の文字コードが指定されています。") from exc
-    encoding_errors = parser.get("output", "encoding_errors", fallback="strict").strip().lower() or "strict"
-    valid_encoding_errors = {
-        "strict",
-        "replace",
-        "ignore",
-        "backslashreplace",
-        "xmlcharrefreplace",
-        "namereplace",
-    }
-    if encoding_errors not in valid_encoding_errors:
+    encoding_errors = sys.intern(_get_str(section, "encoding_errors", "strict").lower() or "strict")
+    if encoding_errors not in _VALID_ENCODING_ERRORS:
         raise ValueError(
             "output.encoding_errors は strict/replace/ignore/backslashreplace/xmlcharrefreplace/namereplace のいずれかを指定してください。"
         )
-    line_end_mode = parser.get("output", "line_end_mode", fallback="literal").strip().lower() or "literal"
-    if line_end_mode not in {"literal", "escape"}:
+    line_end_mode = sys.intern(_get_str(section, "line_end_mode", "literal").lower() or "literal")
+    if line_end_mode not in _VALID_LINE_END_MODES:
         raise ValueError("output.line_end_mode は literal / escape のいずれかを指定してください。")
-    line_end = parser.get("output", "line_end", fallback="\r\n")
-    line_end = _parse_line_end(line_end, line_end_mode=line_end_mode)
+    line_end = section.get("line_end", "\r\n")
+    line_end = _parse_line_end(line_end, line_end_mode)
     terminator_keys = _parse_key_list(
-        parser.get("output", "terminator_keys", fallback=None),
+        section.get("terminator_keys"),
         default=DEFAULT_TERMINATOR_KEYS,
         field_name="output.terminator_keys",
     )
-    send_on_enter = _get_bool(parser, "output", "send_on_enter", True)
-    send_mode = parser.get("output", "send_mode", fallback="on_enter").strip().lower() or "on_enter"
-    if send_mode not in {"on_enter", "per_char", "idle_timeout"}:
+    send_on_enter = _get_bool(section, "send_on_enter", True, field_name="output.send_on_enter")
+    send_mode = sys.intern(_get_str(section, "send_mode", "on_enter").lower() or "on_enter")
+    if send_mode not in _VALID_SEND_MODES:
         raise ValueError("output.send_mode は on_enter / per_char / idle_timeout のいずれかを指定してください。")
-    idle_timeout_seconds = parser.getfloat("output", "idle_timeout_seconds", fallback=0.5)
-    if idle_timeout_seconds < 0:
-        raise ValueError("output.idle_timeout_seconds は 0 以上の値を指定してください。")
-    dedup_window_seconds = parser.getfloat("output", "dedup_window_seconds", fallback=0.2)
-    if dedup_window_seconds < 0:
-        raise ValueError("output.dedup_window_seconds は 0 以上の値を指定してください。")
+    idle_timeout_seconds = _require_non_negative(
+        float(section.get("idle_timeout_seconds", "0.5")),
+        field_name="output.idle_timeout_seconds",
+    )
+    dedup_window_seconds = _require_non_negative(
+        float(section.get("dedup_window_seconds", "0.2")),
+        field_name="output.dedup_window_seconds",
+    )
+
+    return OutputConfig(
+        encoding=encoding,
+        encoding_errors=encoding_errors,
+        line_end=line_end,
+        line_end_mode=line_end_mode,
+        terminator_keys=terminator_keys,
+        send_on_enter=send_on_enter,
+        send_mode=send_mode,
+        idle_timeout_seconds=idle_timeout_seconds,
+        dedup_window_seconds=dedup_window_seconds,
+    )
+
+
+# 設定ファイルを読み込んでアプリ設定に変換する。
+def load_config(path: Path) -> AppConfig:
+    """config.ini を検証しながら AppConfig に変換する。
+
+    毎回ファイル全体を読み、同じパスの前回の内容とハッシュが一致すれば解析済みの設定を再利用する。
+    mtime の分解能内で同じサイズに書き換えられた場合も、内容の比較で読み直しを取りこぼさない。
+    """
+    path_str = str(path.resolve())
+    # 存在確認と読み込みを分けずに1回のopenで済ませ、全体を一度に読んでからデコードする。
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"config file not found: {path}") from exc
+    except OSError as exc:
+        raise ValueError("config.ini の読み取りに失敗しました。") from exc
+    # 同じファイルを同じ内容で保存し直しただけの場合は解析を省く。
+    digest = hashlib.blake2b(data, digest_size=8).digest()
+    cached = _CONFIG_BY_PATH.get(path_str)
+    if cached is not None and cached[0] == digest:
+        config = cached[1]
+        # 解析を省いても、読み込むたびに出る警告は変わらないようにする。
+        _warn_unknown_keys(sorted(config.input.prefer_event_has_keys), field_name="input.prefer_event_has_keys")
+        _warn_unknown_keys(sorted(config.output.terminator_keys), field_name="output.terminator_keys")
+        return config
+    config = _parse_config_bytes(data)
+    _CONFIG_BY_PATH.pop(path_str, None)
+    if len(_CONFIG_BY_PATH) >= _CONFIG_BY_PATH_MAXSIZE:
+        # 最も古いエントリから捨てる。
+        del _CONFIG_BY_PATH[next(iter(_CONFIG_BY_PATH))]
+    _CONFIG_BY_PATH[path_str] = (digest, config)
+    return config
+
+
+# 設定ファイルの内容を解析してアプリ設定に変換する。
+def _parse_config_bytes(data: bytes) -> AppConfig:
+    """config.ini のバイト列をデコードし、検証済みの AppConfig を返す。"""
+    # Windowsのメモ帳などで付くBOMは utf-8-sig で取り除く。
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise ValueError("config.ini の読み取りに失敗しました。") from exc
+    try:
+        sections = _parse_ini(text)
+    except _UnsupportedIniSyntax:
+        sections = _parse_ini_with_configparser(text)
 
+    # 必須セクションが揃っているかを最初に確認する。
+    # 3セクションのみなので集合やソートを作らず、定義順のまま辞書を引く。
+    missing_sections = [name for name in REQUIRED_SECTIONS if name not in sections]
+    if missing_sections:
+        missing_labels = ", ".join(missing_sections)
+        raise ValueError(f"config.ini に必要なセクションがありません: {missing_labels}")
+    # 各セクションは対応する設定クラスをその場で組み立てて検証する。
     return AppConfig(
-        input=InputConfig(
-            mode=mode,
-            device=device,
-            vendor_id=vendor_id,
-            product_id=product_id,
-            device_name_contains=device_name_contains,
-            prefer_event_has_keys=prefer_event_has_keys,
-            grab=grab,
-            reconnect_interval_seconds=reconnect_interval_seconds,
-        ),
-        serial=SerialConfig(
-            port=port,
-            baudrate=baudrate,
-            timeout=timeout,
-            write_timeout=write_timeout,
-            bytesize=bytesize,
-            parity=parity,
-            stopbits=stopbits,
-            xonxoff=xonxoff,
-            rtscts=rtscts,
-            dsrdtr=dsrdtr,
-            exclusive=exclusive,
-            emulate_modem_signals=emulate_modem_signals,
-            dtr=dtr,
-            rts=rts,
-            emulate_timing=emulate_timing,
-            pty_link=pty_link,
-            pty_mode=pty_mode,
-            pty_group=pty_group,
-        ),
-        output=OutputConfig(
-            encoding=encoding,
-            encoding_errors=encoding_errors,
-            line_end=line_end,
-            line_end_mode=line_end_mode,
-            terminator_keys=terminator_keys,
-            send_on_enter=send_on_enter,
-            send_mode=send_mode,
-            idle_timeout_seconds=idle_timeout_seconds,
-            dedup_window_seconds=dedup_window_seconds,
-        ),
+        input=_build_input(sections["input"]),
+        serial=_build_serial(sections["serial"]),
+        output=_build_output(sections["output"]),
     )
+
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 
-SHIFT_KEYCODES = {"KEY_LEFTSHIFT", "KEY_RIGHTSHIFT"}
-KANA_TOGGLE_KEYCODES = {"KEY_KANA", "KEY_KATAKANA", "KEY_HIRAGANA", "KEY_KATAKANAHIRAGANA"}
+# 実行時の判定表（シフトのビット割り当てや特殊キーの振り分け）はこれらから一度だけ作るため、変更不可にする。
+SHIFT_KEYCODES = frozenset({"KEY_LEFTSHIFT", "KEY_RIGHTSHIFT"})
+KANA_TOGGLE_KEYCODES = frozenset({"KEY_KANA", "KEY_KATAKANA", "KEY_HIRAGANA", "KEY_KATAKANAHIRAGANA"})
 
 @dataclass(frozen=True)
 class KeyMapper:
@@ -13,22 +14,23 @@ class KeyMapper:
     shifted: Dict[str, str]
     kana_unshifted: Dict[str, str] = field(default_factory=dict)
     kana_shifted: Dict[str, str] = field(default_factory=dict)
-    
+    # (かな << 1 | シフト) で引く、フォールバック適用済みの変換表。
+    _tables: Tuple[Dict[str, str], ...] = field(init=False, repr=False, compare=False)
+
+    # フォールバックを反映した状態別の変換表を作る。
+    def __post_init__(self) -> None:
+        """キー入力ごとのフォールバック探索を省くため、状態ごとの表を事前に合成する。"""
+        # シフト表の空文字は未定義扱いとし、通常表へフォールバックさせる。
+        shifted = {**self.unshifted, **{key: value for key, value in self.shifted.items() if value}}
+        kana_unshifted = {**self.unshifted, **self.kana_unshifted}
+        kana_shifted = {**shifted, **self.kana_unshifted, **self.kana_shifted}
+        object.__setattr__(self, "_tables", (self.unshifted, shifted, kana_unshifted, kana_shifted))
+
     # キーコードと状態から送信文字を引き当てる。
     def map_keycode(self, keycode: str, shift: bool, *, kana: bool = False) -> Optional[str]:
         """シフト/かな状態を考慮してキーコードを文字に変換する。"""
-        if kana:
-            # かなモード時はシフト有無に応じたマッピングを優先する。
-            mapped = self.kana_shifted.get(keycode) if shift else self.kana_unshifted.get(keycode)
-            if mapped is not None:
-                return mapped
-            # かなのシフト表に無ければ通常のかな表へフォールバックする。
-            fallback = self.kana_unshifted.get(keycode)
-            if fallback is not None:
-                return fallback
-        if shift:
-            return self.shifted.get(keycode) or self.unshifted.get(keycode)
-        return self.unshifted.get(keycode)
+        # かな表 → 通常のかな表 → シフト表 → 通常表の優先順は変換表の合成時に反映済み。
+        return self._tables[(kana << 1) | shift].get(keycode)
 
 
 DEFAULT_KEYMAP = KeyMapper(
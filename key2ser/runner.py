@@ -1,19 +1,24 @@
 from __future__ import annotations
 
+import contextlib
 from dataclasses import dataclass, field
 import errno
+import functools
 import grp
 import logging
 import os
 from pathlib import Path
 import pty
+import queue
 import select
+import stat
+import struct
 import threading
 import time
 import tty
-from typing import Iterable, Optional, Set
+from typing import Callable, Iterable, Optional
 
-from evdev import InputDevice, categorize, ecodes, list_devices
+from evdev import InputDevice, ecodes, list_devices
 import serial
 
 from key2ser.config import AppConfig, InputConfig, OutputConfig, SerialConfig
@@ -22,19 +27,52 @@ from key2ser.keymap import DEFAULT_KEYMAP, KANA_TOGGLE_KEYCODES, SHIFT_KEYCODES,
 
 logger = logging.getLogger(__name__)
 
-
-@dataclass
+# 仮想TTYのブリッジで、方向ごとに書き込み待ちとして保持できるデータ量。
+_PTY_BUFFER_SIZE = 64 * 1024
+# 送信タイミングを再現する際に、1回の書き込みでまとめる時間幅。
+_TIMING_BATCH_SECONDS = 0.001
+# キーイベントの種別。イベントごとの ecodes 属性参照を避けるため定数に控える。
+_EV_KEY = ecodes.EV_KEY
+# EV_KEYイベントの value（evdevの KeyEvent.key_up / key_down と同じ値）。
+_KEY_UP = 0
+_KEY_DOWN = 1
+# カーネルの input_event 構造体（struct timeval, type, code, value）のネイティブ配置。
+_INPUT_EVENT = struct.Struct("llHHi")
+# 入力デバイスから1回の read でまとめて読み取るイベント数。
+_INPUT_READ_EVENTS = 64
+# 通信速度どおりに送出する実機のUARTとして扱うTTY名の接頭辞。
+_UART_TTY_PREFIXES = ("ttyS", "ttyUSB", "ttyACM", "ttyAMA")
+
+# シフトキーごとの押下状態ビット。左右の同時押しと片側だけの解放を区別する。
+_SHIFT_BITS = {keycode: 1 << index for index, keycode in enumerate(sorted(SHIFT_KEYCODES))}
+# キーダウン時の処理関数（keycode, state, keymap, line_end, send_on_enter, send_mode）。
+_KeyDownHandler = Callable[[str, "BufferState", KeyMapper, str, bool, str], Optional[str]]
+
+
+# キー入力ごとに参照・更新するため、__dict__ を持たない slots で属性アクセスを軽くする。
+@dataclass(slots=True)
 class BufferState:
-    text: str = ""
-    shift_keys: Set[str] = field(default_factory=set)
+    # 1文字ずつ追加・削除するため、文字列の再生成を避けてリストで保持する。
+    chars: list[str] = field(default_factory=list)
+    # 押下中のシフトキーを _SHIFT_BITS のビットで保持する。
+    shift_mask: int = 0
     kana_mode: bool = False
     last_input_time: float | None = None
     last_sent_payload: str | None = None
+    last_sent_hash: int | None = None
     last_sent_time: float | None = None
 
     @property
     def shift_active(self) -> bool:
-        return bool(self.shift_keys)
+        return bool(self.shift_mask)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chars)
+
+    @text.setter
+    def text(self, value: str) -> None:
+        self.chars = list(value)
 
 
 class DeviceNotFoundError(RuntimeError):
@@ -82,63 +120,360 @@ class SerialPortHandle:
     port: serial.Serial
     display_port: str
     resources: Optional[VirtualPtyResources] = None
+    # 書き込みスレッドからの書き込みとクローズが重ならないようにするロック。
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    # 送信先が実機のシリアルポートか。送信のたびに端末名を調べないよう、オープン時に1度だけ判定する。
+    is_hardware: bool = field(default=False, init=False)
+
+    def __post_init__(self) -> None:
+        self.is_hardware = _is_hardware_serial(self.port)
 
     def __enter__(self) -> "SerialPortHandle":
         return self
 
     def __exit__(self, exc_type, exc, tb) -> bool:
-        if self.resources is not None:
-            self.resources.close()
-        self.port.close()
+        with self._lock:
+            if self.resources is not None:
+                self.resources.close()
+            self.port.close()
         return False
 
+    # 送信のたびに __getattr__ の失敗探索を経由しないよう、頻繁に使うメソッドは明示的に転送する。
+    def write(self, data: bytes) -> Optional[int]:
+        with self._lock:
+            port = self.port
+            # クローズ後に再利用された番号へ書き込まないよう、fd はキャッシュせず毎回確認する。
+            fd = getattr(port, "fd", None)
+            if not isinstance(fd, int) or not getattr(port, "is_open", True):
+                return port.write(data)
+            # pyserial の write は書き込み後に毎回 select で待つため、まず os.write で直接書き込む。
+            try:
+                written = os.write(fd, data)
+            except BlockingIOError:
+                written = 0
+            except OSError as exc:
+                raise serial.SerialException(f"write failed: {exc}") from exc
+            if written < len(data):
+                # 送信バッファが詰まった場合は、write_timeout の扱いを含めて残りを pyserial に任せる。
+                written += port.write(data[written:]) or 0
+            return written
+
+    def flush(self) -> None:
+        self.port.flush()
+
     def __getattr__(self, name: str):
         return getattr(self.port, name)
 
 
+# 書き込みスレッドへの送信完了待ち要求と終了要求。
+_WRITER_FLUSH = object()
+_WRITER_STOP = object()
+# 書き込みスレッドへ積める要求の上限。フロー制御で送信が止まった際は入力側を待たせる。
+_WRITER_QUEUE_SIZE = 256
+# 終了時に書き込みスレッドを待つ時間。止まった送信は打ち切ってから改めて待つ。
+_WRITER_JOIN_SECONDS = 1.0
+
+
+class _SerialWriterThread:
+    """逐次送信の書き込みを別スレッドで行い、失敗は eventfd でイベントループへ通知する。"""
+
+    def __init__(self, port: SerialPortHandle) -> None:
+        self._port = port
+        self._queue: queue.Queue[object] = queue.Queue(maxsize=_WRITER_QUEUE_SIZE)
+        self._error: Optional[BaseException] = None
+        self._abort = threading.Event()
+        # 書き込みの失敗を次の打鍵を待たずに伝えるため、イベントループの epoll で監視させる。
+        self.error_fd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "_SerialWriterThread":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        # 終了要求より前に積まれたデータは書き込んでからスレッドを止める。
+        try:
+            self._queue.put(_WRITER_STOP, timeout=_WRITER_JOIN_SECONDS)
+        except queue.Full:
+            pass
+        self._thread.join(_WRITER_JOIN_SECONDS)
+        if self._thread.is_alive():
+            # フロー制御などで送信が止まったままの場合は、未送信分を捨てて書き込みを打ち切る。
+            logger.warning("シリアルへの送信が完了しないため、未送信のデータを破棄します。")
+            self._abort.set()
+            self._cancel_port_io()
+            try:
+                self._queue.put_nowait(_WRITER_STOP)
+            except queue.Full:
+                pass
+            self._thread.join(_WRITER_JOIN_SECONDS)
+        if self._thread.is_alive():
+            # 通知用の番号が再利用されないよう、停止できなかった場合は閉じずに残す。
+            logger.warning("シリアルの書き込みスレッドを停止できませんでした。")
+        else:
+            os.close(self.error_fd)
+        if exc_type is None:
+            self.raise_pending_error()
+        return False
+
+    def write(self, data: bytes) -> int:
+        self.raise_pending_error()
+        self._queue.put(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        self.raise_pending_error()
+        self._queue.put(_WRITER_FLUSH)
+
+    # 書き込みスレッドで発生した例外を呼び出し側へ伝える。
+    def raise_pending_error(self) -> None:
+        """書き込みが失敗していれば、再接続の対象となる例外を送出する。"""
+        if self._error is not None:
+            raise SerialConnectionError("シリアルへの送信に失敗しました。") from self._error
+
+    # 送信中の書き込みと送信完了待ちを中断させる。
+    def _cancel_port_io(self) -> None:
+        """pyserial の書き込み待ちを取り消し、出力バッファを捨てて tcdrain を戻らせる。"""
+        for name in ("cancel_write", "reset_output_buffer"):
+            method = getattr(self._port, name, None)
+            if method is None:
+                continue
+            try:
+                method()
+            except (serial.SerialException, OSError) as exc:
+                logger.debug("シリアルの送信中断に失敗しました: %s", exc)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            pending = bytearray()
+            flush = False
+            stop = False
+            # 溜まっている要求をまとめ、1回の書き込みと送信完了待ちで処理する。
+            while True:
+                if item is _WRITER_STOP:
+                    stop = True
+                elif item is _WRITER_FLUSH:
+                    flush = True
+                else:
+                    pending += item
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            # 失敗後や打ち切り後のデータは送らず、キューを空にし続けて入力側を止めない。
+            if self._error is None and not self._abort.is_set():
+                try:
+                    if pending:
+                        self._port.write(bytes(pending))
+                    if flush:
+                        self._port.flush()
+                except Exception as exc:
+                    if isinstance(exc, (serial.SerialException, OSError, SerialConnectionError)):
+                        logger.warning("シリアルへの書き込みに失敗しました: %s", exc)
+                    else:
+                        logger.exception("シリアルの書き込みスレッドで予期しないエラーが発生しました。")
+                    self._error = exc
+                    os.eventfd_write(self.error_fd, 1)
+            if stop or self._abort.is_set():
+                return
+
+    def __getattr__(self, name: str):
+        return getattr(self._port, name)
+
+
+# 送信用の書き込みスレッドを必要に応じて起動する。
+def _start_serial_writer(
+    port: SerialPortHandle, serial_config: SerialConfig, send_mode: str
+) -> contextlib.AbstractContextManager:
+    """逐次送信だけをスレッドに任せ、ペイロード単位で送信完了を待つ送信方式はそのまま返す。"""
+    # Enter送信/アイドル送信は送信完了（tcdrain）を1件ごとの区切りとするため同期のまま送る。
+    # 送信間隔の再現時も書き込みタイミングを保つため、スレッドを使わない。
+    if send_mode != "per_char" or serial_config.emulate_timing:
+        return contextlib.nullcontext(port)
+    return _SerialWriterThread(port)
+
+
+class _CoalescingWriter:
+    """逐次送信で、1回の読み取りで届いた文字の書き込みをまとめて送るバッファ。"""
+
+    __slots__ = ("_port", "_pending")
+
+    def __init__(self, port: SerialPortHandle) -> None:
+        self._port = port
+        self._pending = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._pending += data
+        return len(data)
+
+    def flush(self) -> None:
+        self.send_pending()
+        self._port.flush()
+
+    # 溜めたバイト列を1回の書き込みで送信する。
+    def send_pending(self) -> None:
+        """保留中のデータをシリアルへ書き込み、バッファを空にする。"""
+        if not self._pending:
+            return
+        data = bytes(self._pending)
+        self._pending.clear()
+        try:
+            _write_chunk_with_retry(self._port, data)
+        except (serial.SerialException, OSError) as exc:
+            raise SerialConnectionError("シリアルへの送信に失敗しました。") from exc
+
+    def __getattr__(self, name: str):
+        return getattr(self._port, name)
+
+
+class _ByteRing:
+    """PTY転送で書き込み待ちのデータを保持する固定長リングバッファ。"""
+
+    __slots__ = ("_view", "_capacity", "_start", "_size")
+
+    def __init__(self, capacity: int) -> None:
+        self._view = memoryview(bytearray(capacity))
+        self._capacity = capacity
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def free_views(self) -> list[memoryview]:
+        """空き領域を readv に渡せる形（最大2区間）で返す。"""
+        free = self._capacity - self._size
+        if not free:
+            return []
+        end = (self._start + self._size) % self._capacity
+        if end + free <= self._capacity:
+            return [self._view[end : end + free]]
+        return [self._view[end:], self._view[: free - (self._capacity - end)]]
+
+    def data_views(self) -> list[memoryview]:
+        """保持中のデータを writev に渡せる形（最大2区間）で返す。"""
+        end = self._start + self._size
+        if end <= self._capacity:
+            return [self._view[self._start : end]]
+        return [self._view[self._start :], self._view[: end - self._capacity]]
+
+    def produce(self, count: int) -> None:
+        """空き領域に書き込まれた分だけデータを増やす。"""
+        self._size += count
+
+    def consume(self, count: int) -> None:
+        """先頭から送信済みの分だけデータを捨てる。"""
+        self._size -= count
+        self._start = (self._start + count) % self._capacity if self._size else 0
+
+    def clear(self) -> None:
+        """保持中のデータをすべて破棄する。"""
+        self._start = 0
+        self._size = 0
+
+
 class VirtualPtyBridge:
     def __init__(self, master_a: int, master_b: int) -> None:
         self._master_a = master_a
         self._master_b = master_b
-        self._stop_event = threading.Event()
+        self._peers = {master_a: master_b, master_b: master_a}
+        # 書き込み先ごとに送信待ちデータを持ち、まとめて writev で送る。
+        self._pending = {master_a: _ByteRing(_PTY_BUFFER_SIZE), master_b: _ByteRing(_PTY_BUFFER_SIZE)}
+        self._waiting_writable = {master_a: False, master_b: False}
+        # エッジトリガーでは読み切りが前提のため、マスター側はノンブロッキングにする。
+        for fd in (master_a, master_b):
+            os.set_blocking(fd, False)
+        # 停止要求はeventfdで通知し、タイムアウト待ちなしで監視を抜ける。
+        self._wakeup_fd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+        self._epoll = select.epoll()
+        for fd in (master_a, master_b):
+            self._epoll.register(fd, select.EPOLLIN | select.EPOLLET)
+        self._epoll.register(self._wakeup_fd, select.EPOLLIN)
         self._thread = threading.Thread(target=self._run, daemon=True)
 
     def start(self) -> None:
         self._thread.start()
 
     def close(self) -> None:
-        self._stop_event.set()
-        for fd in (self._master_a, self._master_b):
+        try:
+            os.eventfd_write(self._wakeup_fd, 1)
+        except OSError:
+            pass
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+        self._epoll.close()
+        for fd in (self._master_a, self._master_b, self._wakeup_fd):
             try:
                 os.close(fd)
             except OSError:
                 continue
-        self._thread.join(timeout=1.0)
 
     def _run(self) -> None:
-        while not self._stop_event.is_set():
+        while True:
             try:
-                readable, _, _ = select.select([self._master_a, self._master_b], [], [], 0.5)
-            except OSError as exc:
-                if self._stop_event.is_set():
+                events = self._epoll.poll()
+            except (OSError, ValueError) as exc:
+                # 停止通知より先にepollが閉じられた場合も監視を終える。
+                if self._epoll.closed:
                     return
                 logger.warning("仮想TTYのブリッジ監視に失敗しました: %s", exc)
                 continue
-            for fd in readable:
-                try:
-                    data = os.read(fd, 1024)
-                except OSError as exc:
-                    if not self._stop_event.is_set():
-                        logger.warning("仮想TTYの読み取りに失敗しました: %s", exc)
-                    continue
-                if not data:
-                    continue
-                target = self._master_b if fd == self._master_a else self._master_a
-                try:
-                    os.write(target, data)
-                except OSError as exc:
-                    if not self._stop_event.is_set():
-                        logger.warning("仮想TTYの書き込みに失敗しました: %s", exc)
+            for fd, mask in events:
+                if fd == self._wakeup_fd:
+                    return
+                if mask & select.EPOLLOUT:
+                    # 書き込み待ちが解消したら、バッファ満杯で止めていた読み取りも再開する。
+                    self._flush(fd)
+                    self._forward(self._peers[fd], fd)
+                if mask & ~select.EPOLLOUT:
+                    self._forward(fd, self._peers[fd])
+
+    def _forward(self, fd: int, target: int) -> None:
+        """エッジトリガーの通知に合わせ、読み取れなくなるまで転送する。"""
+        ring = self._pending[target]
+        while True:
+            views = ring.free_views()
+            if not views:
+                # 書き込み先が詰まっている間は読み取りを止め、EPOLLOUT で再開する。
+                return
+            try:
+                count = os.readv(fd, views)
+            except BlockingIOError:
+                return
+            except OSError as exc:
+                # 相手側の端末が未接続の間はEIOになるため、警告は出さない。
+                if exc.errno == errno.EIO:
+                    logger.debug("仮想TTYの相手側が未接続です: %s", exc)
+                elif not self._epoll.closed:
+                    logger.warning("仮想TTYの読み取りに失敗しました: %s", exc)
+                return
+            if not count:
+                return
+            ring.produce(count)
+            self._flush(target)
+
+    def _flush(self, target: int) -> None:
+        """送信待ちデータを書き込めるだけ書き込み、残りがあれば EPOLLOUT を待つ。"""
+        ring = self._pending[target]
+        while ring:
+            try:
+                written = os.writev(target, ring.data_views())
+            except BlockingIOError:
+                break
+            except OSError as exc:
+                if not self._epoll.closed:
+                    logger.warning("仮想TTYの書き込みに失敗しました: %s", exc)
+                ring.clear()
+                break
+            ring.consume(written)
+        waiting = bool(ring)
+        if waiting != self._waiting_writable[target]:
+            events = select.EPOLLIN | select.EPOLLET
+            if waiting:
+                events |= select.EPOLLOUT
+            self._epoll.modify(target, events)
+            self._waiting_writable[target] = waiting
 
 
 # 起動時に利用可能な入力デバイスを列挙する。
@@ -178,22 +513,25 @@ def _normalize_device_hint(value: Optional[str]) -> str:
     return value.lower() if value else ""
 
 
+# キー名の集合を数値のキーコード集合に変換する。
+@functools.lru_cache(maxsize=8)
+def _resolve_ecodes(keys: frozenset[str]) -> frozenset[int]:
+    """設定のキー名は起動後に変わらないため、ecodesの名前解決は1度だけ行う。"""
+    return frozenset(code for key in keys if (code := getattr(ecodes, key, None)) is not None)
+
+
 # 入力デバイスが指定キーを持つか判定する。
 def _device_has_keys(device: InputDevice, keys: Iterable[str]) -> bool:
     """EV_KEYの対応キーに指定キーが含まれるか確認する。"""
+    codes = _resolve_ecodes(keys if isinstance(keys, frozenset) else frozenset(keys))
+    if not codes:
+        return False
     try:
-        caps = device.capabilities().get(ecodes.EV_KEY, [])
+        caps = device.capabilities().get(ecodes.EV_KEY, ())
     except OSError as exc:
         logger.debug("入力デバイスのcapabilities取得に失敗しました: %s", exc)
         return False
-    if not caps:
-        return False
-    key_set = set(caps)
-    for key in keys:
-        code = getattr(ecodes, key, None)
-        if code is not None and code in key_set:
-            return True
-    return False
+    return not codes.isdisjoint(caps)
 
 
 # 入力デバイスのスコアリングを行う。
@@ -274,11 +612,11 @@ def _select_device_by_vid_pid(devices: Iterable[str], config: InputConfig) -> In
 def open_input_device(config: InputConfig) -> InputDevice:
     """デバイスパスまたはVID/PID指定でInputDeviceを取得する。"""
     if config.device:
-        path = Path(config.device)
-        if not path.exists():
-            raise DeviceNotFoundError(f"input.device が存在しません: {path}")
+        # 再接続のたびに stat してから開かないよう、存在確認はオープン時のエラーで行う。
         try:
-            return InputDevice(str(path))
+            return InputDevice(config.device)
+        except FileNotFoundError as exc:
+            raise DeviceNotFoundError(f"input.device が存在しません: {config.device}") from exc
         except PermissionError as exc:
             raise DeviceAccessError("入力デバイスへのアクセス権限がありません。") from exc
         except OSError as exc:
@@ -295,10 +633,20 @@ def open_input_device(config: InputConfig) -> InputDevice:
     raise DeviceNotFoundError("input.device または vendor_id/product_id を指定してください。")
 
 
+# 直近に送信した文字列のエンコード結果をキャッシュする。
+@functools.lru_cache(maxsize=1024)
+def _encode_cached(payload: str, encoding: str, errors: str) -> bytes:
+    """per_charでは同じ1文字を繰り返し送るため、コーデック呼び出しを省く。"""
+    return payload.encode(encoding, errors=errors)
+
+
 # 送信前の文字列を指定エンコーディングでバイト化する。
 def _encode_payload(payload: str, encoding: str, *, errors: str) -> bytes:
     """出力文字列をエンコードし、失敗時はValueErrorに変換する。"""
     try:
+        # 行単位のペイロードは再利用されず、読み取ったコードを保持し続けることにもなるため1文字だけキャッシュする。
+        if len(payload) == 1:
+            return _encode_cached(payload, encoding, errors)
         return payload.encode(encoding, errors=errors)
     except UnicodeEncodeError as exc:
         raise PayloadEncodeError("指定されたエンコーディングで変換できない文字が含まれています。") from exc
@@ -313,7 +661,31 @@ def _calculate_frame_seconds(serial_config: SerialConfig) -> float:
     return bits_per_frame / serial_config.baudrate
 
 
-# シリアルの通信速度に合わせて1バイトずつ送信する
+# 送信先が実機のシリアルポートか判定する。
+def _is_hardware_serial(port: serial.Serial) -> bool:
+    """実機のUARTとして知られた名前のTTYに接続されていれば True を返す。"""
+    try:
+        name = os.ttyname(port.fileno())
+    except (AttributeError, OSError, ValueError, serial.SerialException):
+        # 判定できない場合は送信間隔をソフトウェアで制御する側に倒す。
+        return False
+    # rfcomm や USBガジェット、ヌルモデムのペアなどは通信速度どおりに送出しないため、
+    # 名前で確かめられたUARTだけを実機として扱い、それ以外は送信間隔を制御する。
+    return os.path.basename(name).startswith(_UART_TTY_PREFIXES)
+
+
+# 短い書き込みを考慮してチャンクを書き込む。
+def _write_chunk_with_retry(port: serial.Serial, chunk: bytes) -> None:
+    """書き込めなかった残りを少数回リトライして確実に送信する。"""
+    for _attempt in range(3):
+        written = port.write(chunk) or 0
+        if written >= len(chunk):
+            return
+        chunk = chunk[written:]
+    raise SerialConnectionError("シリアルへの送信に失敗しました。")
+
+
+# シリアルの通信速度に合わせて送信する
 def _send_payload_with_timing(
     port: serial.Serial,
     payload: str,
@@ -322,7 +694,7 @@ def _send_payload_with_timing(
     encoding_errors: str,
     serial_config: SerialConfig,
 ) -> None:
-    """シリアルの通信速度に合わせて1バイトずつ送信する。"""
+    """シリアルの通信速度に合わせ、約1ミリ秒分ずつ区切って送信する。"""
     try:
         data = _encode_payload(payload, encoding, errors=encoding_errors)
     except PayloadEncodeError as exc:
@@ -334,19 +706,24 @@ def _send_payload_with_timing(
     if frame_seconds <= 0:
         _send_payload(port, payload, encoding, encoding_errors=encoding_errors)
         return
-    # 仮想TTYは通信速度の制約がないため、実機に近づける目的で送信間隔を制御する。
-    next_time = time.monotonic()
+    if isinstance(port, SerialPortHandle):
+        is_hardware = port.is_hardware
+    else:
+        is_hardware = _is_hardware_serial(port)
     try:
-        for byte in data:
-            # 短い書き込みが返る可能性があるため、少数回リトライして確実に送信する。
-            for attempt in range(3):
-                written = port.write(bytes([byte]))
-                if written == 1:
-                    break
-                if written in (0, None) and attempt < 2:
-                    continue
-                raise SerialConnectionError("シリアルへの送信に失敗しました。")
-            next_time += frame_seconds
+        if is_hardware:
+            # 実機のUARTは通信速度どおりに送出するため、一括で書き込んで送信完了を待つ。
+            port.write(data)
+            port.flush()
+            return
+        # 仮想TTYは通信速度の制約がないため、実機に近づける目的で送信間隔を制御する。
+        # 1バイトごとのsleepは精度もオーバーヘッドも悪いため、約1ミリ秒分ずつまとめる。
+        batch_size = max(1, int(_TIMING_BATCH_SECONDS / frame_seconds))
+        next_time = time.monotonic()
+        for offset in range(0, len(data), batch_size):
+            chunk = data[offset : offset + batch_size]
+            _write_chunk_with_retry(port, chunk)
+            next_time += frame_seconds * len(chunk)
             sleep_seconds = next_time - time.monotonic()
             if sleep_seconds > 0:
                 time.sleep(sleep_seconds)
@@ -356,7 +733,14 @@ def _send_payload_with_timing(
 
 
 # シリアルへデータを送信する。
-def _send_payload(port: serial.Serial, payload: str, encoding: str, *, encoding_errors: str) -> None:
+def _send_payload(
+    port: serial.Serial,
+    payload: str,
+    encoding: str,
+    *,
+    encoding_errors: str,
+    flush: bool = True,
+) -> None:
     """シリアルポートにペイロードを書き込み送信する。"""
     try:
         data = _encode_payload(payload, encoding, errors=encoding_errors)
@@ -365,7 +749,8 @@ def _send_payload(port: serial.Serial, payload: str, encoding: str, *, encoding_
         return
     try:
         port.write(data)
-        port.flush()
+        if flush:
+            port.flush()
     except (serial.SerialException, OSError, getattr(serial, "SerialTimeoutException", serial.SerialException)) as exc:
         raise SerialConnectionError("シリアルへの送信に失敗しました。") from exc
 
@@ -376,15 +761,21 @@ def _should_suppress_duplicate(
     *,
     dedup_window_seconds: float,
     now: float,
+    payload_hash: int | None = None,
 ) -> bool:
     """直近の送信と重複する場合に抑止するか判定する。"""
     if dedup_window_seconds <= 0:
         return False
     if state.last_sent_payload is None or state.last_sent_time is None:
         return False
-    if payload != state.last_sent_payload:
+    # 時間窓とハッシュで大半の非重複を弾き、文字列全体の比較は最後に行う。
+    if now - state.last_sent_time > dedup_window_seconds:
         return False
-    return now - state.last_sent_time <= dedup_window_seconds
+    if payload_hash is None:
+        payload_hash = hash(payload)
+    if payload_hash != state.last_sent_hash:
+        return False
+    return payload == state.last_sent_payload
 
 
 # 重複送信を抑止しながらペイロードを送信する
@@ -401,12 +792,14 @@ def _send_payload_with_dedup(
 ) -> None:
     """重複送信を抑止しながらペイロードを送信する。"""
     now = time.monotonic()
+    payload_hash = hash(payload)
     if send_mode != "per_char":
         if _should_suppress_duplicate(
             state,
             payload,
             dedup_window_seconds=dedup_window_seconds,
             now=now,
+            payload_hash=payload_hash,
         ):
             # バーコードリーダーの二重送信を抑止するため、短時間の同一ペイロードは無視する。
             return
@@ -419,22 +812,48 @@ def _send_payload_with_dedup(
             serial_config=serial_config,
         )
     else:
-        _send_payload(port, payload, encoding, encoding_errors=encoding_errors)
+        # flush は送出完了まで待つ tcdrain のため、逐次送信ではキー入力ごとに待たず
+        # カーネルの送信バッファに任せる。Enter送信/アイドル送信はペイロードごとの区切りとして
+        # 入力処理のスレッドで送信完了まで待つ。
+        _send_payload(
+            port,
+            payload,
+            encoding,
+            encoding_errors=encoding_errors,
+            flush=send_mode != "per_char",
+        )
     state.last_sent_payload = payload
+    state.last_sent_hash = payload_hash
     state.last_sent_time = now
 
 
 # 入力バッファを初期化する。
 def _reset_buffer(state: BufferState) -> None:
     """送信後に状態を初期化するためのヘルパー。"""
-    state.text = ""
+    state.chars.clear()
     state.last_input_time = None
 
 
-# キーイベントからキーコードのリストを取得する。
-def _iter_keycodes(key_event) -> Iterable[str]:
-    """単一/複数のキーコード表現を統一して返す。"""
-    return key_event.keycode if isinstance(key_event.keycode, list) else [key_event.keycode]
+# バッファの内容に改行コードを付けて取り出す。
+def _take_payload(state: BufferState, line_end: str) -> str:
+    """改行コードもリストに加えて1回の join で送信文字列を作り、バッファを初期化する。"""
+    state.chars.append(line_end)
+    payload = "".join(state.chars)
+    _reset_buffer(state)
+    return payload
+
+
+# 数値のキーコードからキー名への対応表を作る。
+def _build_keycode_table() -> dict[int, tuple[str, ...]]:
+    """ecodes.keys を事前に正規化し、イベントごとのKeyEvent生成と名前解決を省く。"""
+    table: dict[int, tuple[str, ...]] = {}
+    for code, names in getattr(ecodes, "keys", {}).items():
+        table[code] = tuple(names) if isinstance(names, (list, tuple)) else (names,)
+    return table
+
+
+# evdevのKEY_*/BTN_*コードとキー名の対応表。
+_CODE_TO_KEYCODES = _build_keycode_table()
 
 
 # シリアルポートを開く。
@@ -476,7 +895,14 @@ def _open_serial_port(config: AppConfig) -> SerialPortHandle:
                 display_port = str(resources.symlink_path)
             else:
                 display_port = resources.peer_slave
-        return SerialPortHandle(port=port, display_port=display_port, resources=resources)
+        handle = SerialPortHandle(port=port, display_port=display_port, resources=resources)
+        if config.serial.emulate_timing:
+            # 実機かどうかの判定で送信間隔の制御方法が変わるため、選んだ方式を残しておく。
+            if handle.is_hardware:
+                logger.info("送信間隔の再現: %s は実機のUARTのため、通信速度どおりの送出に任せます。", port_name)
+            else:
+                logger.info("送信間隔の再現: %s は実機のUARTではないため、ソフトウェアで送信間隔を制御します。", port_name)
+        return handle
     except TypeError as exc:
         if resources is not None:
             resources.close()
@@ -564,14 +990,20 @@ def _create_pty_symlink(serial_config: SerialConfig, peer_slave: str) -> tuple[O
     if serial_config.pty_link is None:
         return None, False
     link_path = Path(serial_config.pty_link)
-    if link_path.exists() or link_path.is_symlink():
-        if link_path.is_symlink():
-            try:
-                link_path.unlink()
-            except OSError as exc:
-                raise SerialConnectionError("既存のシンボリックリンクを削除できませんでした。") from exc
-        else:
+    # lstat 1回でリンク切れを含む既存パスの有無と種類を判定する。
+    try:
+        link_stat = link_path.lstat()
+    except FileNotFoundError:
+        link_stat = None
+    except OSError as exc:
+        raise SerialConnectionError("仮想TTYのリンク作成に失敗しました。") from exc
+    if link_stat is not None:
+        if not stat.S_ISLNK(link_stat.st_mode):
             raise SerialConnectionError("serial.pty_link のパスが既に存在しています。")
+        try:
+            link_path.unlink()
+        except OSError as exc:
+            raise SerialConnectionError("既存のシンボリックリンクを削除できませんでした。") from exc
     try:
         link_path.symlink_to(peer_slave)
     except OSError as exc:
@@ -622,42 +1054,85 @@ def _close_input_device(device: InputDevice) -> None:
         logger.warning("入力デバイスのクローズに失敗しました: %s", exc)
 
 
-# キーダウン時のバッファ処理と送信判定を行う。
-def _handle_key_down(
+# シフトキーの押下を記録する。
+def _on_shift_down(
     keycode: str,
     state: BufferState,
     keymap: KeyMapper,
     line_end: str,
-    terminator_keys: Iterable[str],
     send_on_enter: bool,
     send_mode: str,
 ) -> Optional[str]:
-    """キーダウンイベントを解釈して送信文字列を返す。"""
-    if keycode in SHIFT_KEYCODES:
-        state.shift_keys.add(keycode)
-        return None
-    if keycode in KANA_TOGGLE_KEYCODES:
-        state.kana_mode = not state.kana_mode
-        return None
-    if keycode in terminator_keys and send_mode == "on_enter":
-        # バーコードリーダーはEnterで終端することが多いため、ここでまとめて送信する。
-        payload = state.text + line_end if state.text or send_on_enter else None
+    """押されたシフトキーのビットを立てる。"""
+    state.shift_mask |= _SHIFT_BITS[keycode]
+    return None
+
+
+# かなモードを切り替える。
+def _on_kana_toggle(
+    keycode: str,
+    state: BufferState,
+    keymap: KeyMapper,
+    line_end: str,
+    send_on_enter: bool,
+    send_mode: str,
+) -> Optional[str]:
+    """かな切替キーでかなモードを反転する。"""
+    state.kana_mode = not state.kana_mode
+    return None
+
+
+# 終端キーでバッファをまとめて送信する。
+def _on_terminator(
+    keycode: str,
+    state: BufferState,
+    keymap: KeyMapper,
+    line_end: str,
+    send_on_enter: bool,
+    send_mode: str,
+) -> Optional[str]:
+    """バッファに改行コードを付けて送信文字列を返す。"""
+    # バーコードリーダーはEnterで終端することが多いため、ここでまとめて送信する。
+    if not state.chars and not send_on_enter:
         _reset_buffer(state)
-        if payload is not None:
-            return payload
-        return None
-    if keycode == "KEY_BACKSPACE":
-        if send_mode != "per_char":
-            # 逐次送信でなければバッファから最後の1文字を削除する。
-            state.text = state.text[:-1]
-            if send_mode == "idle_timeout":
-                state.last_input_time = time.monotonic()
         return None
+    return _take_payload(state, line_end)
+
+
+# バックスペースでバッファの末尾を削除する。
+def _on_backspace(
+    keycode: str,
+    state: BufferState,
+    keymap: KeyMapper,
+    line_end: str,
+    send_on_enter: bool,
+    send_mode: str,
+) -> Optional[str]:
+    """逐次送信以外のモードでバッファの最後の1文字を削除する。"""
+    if send_mode != "per_char":
+        # 逐次送信でなければバッファから最後の1文字を削除する。
+        if state.chars:
+            state.chars.pop()
+        if send_mode == "idle_timeout":
+            state.last_input_time = time.monotonic()
+    return None
+
+
+# 通常キーを文字に変換してバッファへ追加する。
+def _on_mapped_key(
+    keycode: str,
+    state: BufferState,
+    keymap: KeyMapper,
+    line_end: str,
+    send_on_enter: bool,
+    send_mode: str,
+) -> Optional[str]:
+    """キーマップで変換した文字を送信またはバッファに追加する。"""
     mapped = keymap.map_keycode(keycode, state.shift_active, kana=state.kana_mode)
     if mapped:
         if send_mode == "per_char":
             return mapped
-        state.text += mapped
+        state.chars.extend(mapped)
         if send_mode == "idle_timeout":
             # アイドルタイムアウト基準時刻を入力ごとに更新する。
             state.last_input_time = time.monotonic()
@@ -666,11 +1141,45 @@ def _handle_key_down(
     return None
 
 
+# 特殊キーごとの処理関数を引く辞書を作る。
+@functools.lru_cache(maxsize=8)
+def _build_key_dispatch(terminator_keys: frozenset[str], send_mode: str) -> dict[str, _KeyDownHandler]:
+    """シフト > かな > 終端 > バックスペースの優先順で処理関数を割り当てる。"""
+    # 後から登録したものが優先されるため、優先度の低い順に登録する。
+    dispatch: dict[str, _KeyDownHandler] = {"KEY_BACKSPACE": _on_backspace}
+    if send_mode == "on_enter":
+        dispatch.update(dict.fromkeys(terminator_keys, _on_terminator))
+    dispatch.update(dict.fromkeys(KANA_TOGGLE_KEYCODES, _on_kana_toggle))
+    dispatch.update(dict.fromkeys(SHIFT_KEYCODES, _on_shift_down))
+    return dispatch
+
+
+# キーダウン時のバッファ処理と送信判定を行う。
+def _handle_key_down(
+    keycode: str,
+    state: BufferState,
+    keymap: KeyMapper,
+    line_end: str,
+    terminator_keys: Iterable[str],
+    send_on_enter: bool,
+    send_mode: str,
+    *,
+    dispatch: Optional[dict[str, _KeyDownHandler]] = None,
+) -> Optional[str]:
+    """キーダウンイベントを解釈して送信文字列を返す。"""
+    if dispatch is None:
+        dispatch = _build_key_dispatch(frozenset(terminator_keys), send_mode)
+    # 特殊キーの判定を1回の辞書引きにまとめ、通常キーはそのまま変換へ進める。
+    handler = dispatch.get(keycode, _on_mapped_key)
+    return handler(keycode, state, keymap, line_end, send_on_enter, send_mode)
+
+
 # キーアップ時にシフト状態を更新する。
 def _handle_key_up(keycode: str, state: BufferState) -> None:
     """キーアップでシフト状態を解除する。"""
-    if keycode in SHIFT_KEYCODES:
-        state.shift_keys.discard(keycode)
+    bit = _SHIFT_BITS.get(keycode)
+    if bit:
+        state.shift_mask &= ~bit
 
 
 # アイドルタイムアウト時の送信可否を判定する。
@@ -682,13 +1191,11 @@ def _maybe_flush_idle_timeout(
     now: float,
 ) -> Optional[str]:
     """一定時間入力が止まった場合に送信ペイロードを返す。"""
-    if not state.text or state.last_input_time is None:
+    if not state.chars or state.last_input_time is None:
         return None
     if now - state.last_input_time < idle_timeout_seconds:
         return None
-    payload = state.text + line_end
-    _reset_buffer(state)
-    return payload
+    return _take_payload(state, line_end)
 
 
 # 送信ペイロードがあれば重複抑止付きで送信する
@@ -724,13 +1231,45 @@ def _process_key_event(
     output: OutputConfig,
     port: serial.Serial,
     serial_config: SerialConfig,
+    dispatch: Optional[dict[str, _KeyDownHandler]] = None,
 ) -> None:
     """EV_KEYイベントのみを処理して送信する。"""
-    if event.type != ecodes.EV_KEY:
+    _process_raw_event(
+        event.type,
+        event.code,
+        event.value,
+        state=state,
+        keymap=keymap,
+        output=output,
+        port=port,
+        serial_config=serial_config,
+        dispatch=dispatch,
+    )
+
+
+# 生のイベント値を解析して必要に応じて送信する。
+def _process_raw_event(
+    event_type: int,
+    code: int,
+    value: int,
+    *,
+    state: BufferState,
+    keymap: KeyMapper,
+    output: OutputConfig,
+    port: serial.Serial,
+    serial_config: SerialConfig,
+    dispatch: Optional[dict[str, _KeyDownHandler]] = None,
+) -> None:
+    """KeyEventを生成せずに (type, code, value) からEV_KEYを処理する。"""
+    if event_type != _EV_KEY:
+        return
+    # categorize と同じ ecodes.keys 由来の対応表を引き、別名を持つキーは全ての名前を処理する。
+    keycodes = _CODE_TO_KEYCODES.get(code)
+    if keycodes is None:
+        logger.debug("未対応のキーコードです: %s", code)
         return
-    key_event = categorize(event)
-    if key_event.keystate == key_event.key_down:
-        for keycode in _iter_keycodes(key_event):
+    if value == _KEY_DOWN:
+        for keycode in keycodes:
             payload = _handle_key_down(
                 keycode,
                 state,
@@ -739,6 +1278,7 @@ def _process_key_event(
                 output.terminator_keys,
                 output.send_on_enter,
                 output.send_mode,
+                dispatch=dispatch,
             )
             _send_payload_if_present(
                 payload,
@@ -747,21 +1287,56 @@ def _process_key_event(
                 output=output,
                 serial_config=serial_config,
             )
-    elif key_event.keystate == key_event.key_up:
-        for keycode in _iter_keycodes(key_event):
+    elif value == _KEY_UP:
+        for keycode in keycodes:
             _handle_key_up(keycode, state)
 
 
+# 入力デバイスのファイルディスクリプタから生のイベントを読み取る。
+def _read_input_events(fd: int) -> Iterable[tuple[int, int, int, int, int]]:
+    """キューに溜まった input_event 構造体を読み切り、(sec, usec, type, code, value) を返す。"""
+    read_size = _INPUT_EVENT.size * _INPUT_READ_EVENTS
+    chunks: list[bytes] = []
+    while True:
+        try:
+            data = os.read(fd, read_size)
+        except BlockingIOError:
+            break
+        if not data:
+            if chunks:
+                break
+            # evdevのデバイスはEOFを返さないため、切断として扱う。
+            raise OSError(errno.ENODEV, "入力デバイスが切断されました。")
+        chunks.append(data)
+        # 読み取りサイズに満たなければキューは空のため、EAGAINを確かめる読み取りは省く。
+        if len(data) < read_size:
+            break
+    if len(chunks) == 1:
+        return _INPUT_EVENT.iter_unpack(chunks[0])
+    return _INPUT_EVENT.iter_unpack(b"".join(chunks))
+
+
 # アイドルタイムアウト方式のイベントループを実行する。
 def _run_event_loop_idle_timeout(config: AppConfig, device: InputDevice, *, keymap: KeyMapper) -> None:
     """一定時間入力が止まったら送信するモードのループ。"""
     state = BufferState()
     output = config.output
     serial_config = config.serial
-    with _open_serial_port(config) as port:
+    dispatch = _build_key_dispatch(output.terminator_keys, output.send_mode)
+    ev_key = _EV_KEY
+    with (
+        _open_serial_port(config) as port,
+        contextlib.closing(select.epoll()) as poller,
+    ):
         _log_device_info(device, port.display_port)
+        # 監視対象は1デバイスのみのため、epollに一度だけ登録して使い回す。
+        try:
+            fd = device.fileno()
+            poller.register(fd, select.EPOLLIN)
+        except OSError as exc:
+            raise DeviceAccessError("入力デバイスの監視を開始できませんでした。") from exc
         while True:
-            if state.text and state.last_input_time is not None:
+            if state.chars and state.last_input_time is not None:
                 now = time.monotonic()
                 # 入力停止の残り時間を計算して待機時間に使う。
                 remaining = output.idle_timeout_seconds - (now - state.last_input_time)
@@ -783,13 +1358,13 @@ def _run_event_loop_idle_timeout(config: AppConfig, device: InputDevice, *, keym
                     continue
                 timeout = remaining
             else:
-                timeout = None
-            # 入力待ちとタイムアウトを両立させるため、selectで監視する。
+                timeout = -1
+            # 入力待ちとタイムアウトを両立させるため、epollで監視する。
             try:
-                readable, _, _ = select.select([device], [], [], timeout)
+                ready = poller.poll(timeout)
             except OSError as exc:
                 raise DeviceAccessError("入力デバイスの待機中にエラーが発生しました。") from exc
-            if not readable:
+            if not ready:
                 payload = _maybe_flush_idle_timeout(
                     state,
                     line_end=output.line_end,
@@ -805,17 +1380,23 @@ def _run_event_loop_idle_timeout(config: AppConfig, device: InputDevice, *, keym
                 )
                 continue
             try:
-                events = list(device.read())
+                raw_events = _read_input_events(fd)
             except OSError as exc:
                 raise DeviceAccessError("入力デバイスの読み取りに失敗しました。") from exc
-            for event in events:
-                _process_key_event(
-                    event,
+            for _sec, _usec, event_type, code, value in raw_events:
+                # 1回の打鍵でEV_MSC/EV_SYNも届くため、EV_KEY以外は関数を呼ばずに読み飛ばす。
+                if event_type != ev_key:
+                    continue
+                _process_raw_event(
+                    event_type,
+                    code,
+                    value,
                     state=state,
                     keymap=keymap,
                     output=output,
                     port=port,
                     serial_config=serial_config,
+                    dispatch=dispatch,
                 )
 
 
@@ -825,24 +1406,59 @@ def _run_event_loop_default(config: AppConfig, device: InputDevice, *, keymap: K
     state = BufferState()
     output = config.output
     serial_config = config.serial
-    with _open_serial_port(config) as port:
+    dispatch = _build_key_dispatch(output.terminator_keys, output.send_mode)
+    ev_key = _EV_KEY
+    with (
+        _open_serial_port(config) as serial_port,
+        _start_serial_writer(serial_port, serial_config, output.send_mode) as port,
+        contextlib.closing(select.epoll()) as poller,
+    ):
         _log_device_info(device, port.display_port)
         try:
-            event_iterator = device.read_loop()
+            fd = device.fileno()
+            poller.register(fd, select.EPOLLIN)
         except OSError as exc:
             raise DeviceAccessError("入力デバイスの監視を開始できませんでした。") from exc
-        try:
-            for event in event_iterator:
-                _process_key_event(
-                    event,
+        # 書き込みスレッドの失敗は次の打鍵を待たずに検知し、再接続へ進める。
+        writer_error_fd: Optional[int] = None
+        if isinstance(port, _SerialWriterThread):
+            writer_error_fd = port.error_fd
+            poller.register(writer_error_fd, select.EPOLLIN)
+        # 逐次送信では1文字ごとの write を避け、同じ読み取りで届いた文字をまとめて送る。
+        # 送信間隔を再現する場合は1文字ずつの送信タイミングを保つため、まとめない。
+        coalescer: Optional[_CoalescingWriter] = None
+        if output.send_mode == "per_char" and not serial_config.emulate_timing:
+            coalescer = _CoalescingWriter(port)
+        sink = coalescer if coalescer is not None else port
+        while True:
+            try:
+                ready = poller.poll()
+            except OSError as exc:
+                raise DeviceAccessError("入力デバイスの読み取りに失敗しました。") from exc
+            if writer_error_fd is not None and any(ready_fd == writer_error_fd for ready_fd, _mask in ready):
+                port.raise_pending_error()
+            try:
+                # InputEventの生成を省くため、input_event 構造体を直接読み取って解釈する。
+                raw_events = _read_input_events(fd)
+            except OSError as exc:
+                raise DeviceAccessError("入力デバイスの読み取りに失敗しました。") from exc
+            for _sec, _usec, event_type, code, value in raw_events:
+                # 1回の打鍵でEV_MSC/EV_SYNも届くため、EV_KEY以外は関数を呼ばずに読み飛ばす。
+                if event_type != ev_key:
+                    continue
+                _process_raw_event(
+                    event_type,
+                    code,
+                    value,
                     state=state,
                     keymap=keymap,
                     output=output,
-                    port=port,
+                    port=sink,
                     serial_config=serial_config,
+                    dispatch=dispatch,
                 )
-        except OSError as exc:
-            raise DeviceAccessError("入力デバイスの読み取りに失敗しました。") from exc
+            if coalescer is not None:
+                coalescer.send_pending()
 
 
 # 設定に応じて適切なイベントループを起動する。
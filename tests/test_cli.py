@@ -1,4 +1,7 @@
 import logging
+from pathlib import Path
+import subprocess
+import sys
 
 import pytest
 
@@ -9,6 +12,10 @@ def test_unsupported_platform_message_for_windows() -> None:
     assert cli._unsupported_platform_message("win32") is not None
 
 
+def test_unsupported_platform_message_for_cygwin() -> None:
+    assert cli._unsupported_platform_message("cygwin") is not None
+
+
 def test_unsupported_platform_message_for_linux() -> None:
     assert cli._unsupported_platform_message("linux") is None
 
@@ -62,3 +69,49 @@ def test_main_passes_unhandled_error(monkeypatch) -> None:
 
     with pytest.raises(RuntimeError, match="boom"):
         cli.main([])
+
+
+def test_resolve_exit_code_walks_exception_mro() -> None:
+    class CustomConfigError(ValueError):
+        pass
+
+    assert cli._resolve_exit_code(CustomConfigError("bad")) == 4
+    assert cli._resolve_exit_code(FileNotFoundError("missing")) == 2
+    assert cli._resolve_exit_code(RuntimeError("boom")) is None
+
+
+def test_configure_logging_keeps_existing_root_handlers(monkeypatch) -> None:
+    root = logging.getLogger()
+    handler = logging.NullHandler()
+    monkeypatch.setattr(root, "handlers", [handler])
+
+    cli._configure_logging(logging.DEBUG)
+
+    assert root.handlers == [handler]
+
+
+def test_build_parser_reuses_instance() -> None:
+    assert cli._build_parser() is cli._build_parser()
+
+
+def test_importing_cli_does_not_load_runner_dependencies() -> None:
+    code = (
+        "import sys; import key2ser.cli; "
+        "print(any(name in sys.modules for name in ('evdev', 'serial', 'key2ser.runner')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+        text=True,
+    )
+
+    assert result.stdout.strip() == "False"
+
+
+def test_resolve_log_level_rejects_numeric_level_name() -> None:
+    level, warning_message = cli._resolve_log_level("Level 5")
+
+    assert level == logging.INFO
+    assert warning_message is not None
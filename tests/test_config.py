@@ -1,9 +1,11 @@
-import configparser
 import logging
+import os
 from pathlib import Path
+import sys
 
 import pytest
 
+from key2ser import config as config_module
 from key2ser.config import (
     load_config,
     DEFAULT_PREFERRED_INPUT_KEYS,
@@ -11,6 +13,13 @@ from key2ser.config import (
 )
 
 
+@pytest.fixture(autouse=True)
+def _clear_config_cache():
+    # 解析結果のキャッシュはプロセス全体で共有されるため、テストの実行順に依存しないよう毎回空にする。
+    config_module._CONFIG_BY_PATH.clear()
+    yield
+    config_module._CONFIG_BY_PATH.clear()
+
 
 def test_load_config_parses_hex_vid_pid(tmp_path: Path) -> None:
     config_file = tmp_path / "config.ini"
@@ -212,7 +221,7 @@ line_end=\r\n
     assert config.serial.pty_group == "dialout"
     assert config.output.encoding_errors == "replace"
     assert config.input.device_name_contains == "Scanner"
-    assert config.input.prefer_event_has_keys == ("KEY_A", "KEY_B")
+    assert config.input.prefer_event_has_keys == frozenset({"KEY_A", "KEY_B"})
 
 
 def test_load_config_allows_empty_optional_bools(tmp_path: Path) -> None:
@@ -258,7 +267,7 @@ terminator_keys=KEY_ENTER, KEY_KPENTER
 
     config = load_config(config_file)
 
-    assert config.output.terminator_keys == ("KEY_ENTER", "KEY_KPENTER")
+    assert config.output.terminator_keys == frozenset({"KEY_ENTER", "KEY_KPENTER"})
 
 def test_load_config_rejects_negative_dedup_window(tmp_path: Path) -> None:
     config_file = tmp_path / "config.ini"
@@ -422,20 +431,80 @@ line_end=\\r\\n
         load_config(config_file)
 
 
-def test_load_config_handles_parse_error(monkeypatch, tmp_path: Path) -> None:
+def test_load_config_handles_parse_error(tmp_path: Path) -> None:
     config_file = tmp_path / "config.ini"
-    config_file.write_text("[input]\nmode=evdev\n")
+    config_file.write_text("mode=evdev\n[input]\n")
+
+    with pytest.raises(ValueError, match="config.ini の読み取りに失敗しました。"):
+        load_config(config_file)
+
+
+def test_load_config_rejects_duplicate_option(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+mode=evdev
 
-    def raise_parse_error(_self, _path):
-        raise configparser.MissingSectionHeaderError("config.ini", 1, "broken")
+[serial]
+port=/dev/ttyV0
 
-    monkeypatch.setattr(configparser.ConfigParser, "read", raise_parse_error)
+[output]
+encoding=utf-8
+""".strip()
+    )
 
     with pytest.raises(ValueError, match="config.ini の読み取りに失敗しました。"):
         load_config(config_file)
 
 
-def test_load_config_requires_sections(tmp_path: Path) -> None:
+def test_load_config_falls_back_for_section_header_with_comment(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[input] ; 入力\nmode=evdev\n\n[serial]\nport=/dev/ttyV0\n\n[output]\n")
+
+    assert load_config(config_file).serial.port == "/dev/ttyV0"
+
+
+def test_load_config_rejects_empty_section_name(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[]\n[input]\nmode=evdev\n\n[serial]\nport=/dev/ttyV0\n\n[output]\n")
+
+    with pytest.raises(ValueError, match="config.ini の読み取りに失敗しました。"):
+        load_config(config_file)
+
+
+def test_load_config_accepts_configparser_syntax(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+; comment
+[DEFAULT]
+emulate_timing=yes
+
+[input]
+# comment
+MODE : evdev
+
+[serial]
+port = /dev/ttyV0
+baudrate: 19200
+
+[output]
+send_on_enter=off
+""".strip()
+    )
+
+    config = load_config(config_file)
+
+    assert config.input.mode == "evdev"
+    assert config.serial.port == "/dev/ttyV0"
+    assert config.serial.baudrate == 19200
+    assert config.serial.emulate_timing is True
+    assert config.output.send_on_enter is False
+
+
+def test_load_config_rejects_invalid_bool(tmp_path: Path) -> None:
     config_file = tmp_path / "config.ini"
     config_file.write_text(
         """
@@ -444,21 +513,36 @@ mode=evdev
 
 [serial]
 port=/dev/ttyV0
+xonxoff=maybe
+
+[output]
+encoding=utf-8
 """.strip()
     )
 
-    with pytest.raises(ValueError, match="config.ini に必要なセクションがありません"):
+    with pytest.raises(ValueError, match="serial.xonxoff must be boolean"):
         load_config(config_file)
 
 
-def test_load_config_handles_os_error(monkeypatch, tmp_path: Path) -> None:
+def test_load_config_requires_sections(tmp_path: Path) -> None:
     config_file = tmp_path / "config.ini"
-    config_file.write_text("[input]\nmode=evdev\n")
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+
+[serial]
+port=/dev/ttyV0
+""".strip()
+    )
+
+    with pytest.raises(ValueError, match="config.ini に必要なセクションがありません"):
+        load_config(config_file)
 
-    def raise_os_error(_self, _path):
-        raise OSError("permission denied")
 
-    monkeypatch.setattr(configparser.ConfigParser, "read", raise_os_error)
+def test_load_config_handles_os_error(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.mkdir()
 
     with pytest.raises(ValueError, match="config.ini の読み取りに失敗しました。"):
         load_config(config_file)
@@ -488,3 +572,361 @@ terminator_keys=KEY_ENTER, KEY_BAD
     assert "KEY_BOGUS" in caplog.text
     assert "output.terminator_keys に未対応のキーが含まれています" in caplog.text
     assert "KEY_BAD" in caplog.text
+
+
+def test_load_config_warns_for_each_path_with_identical_content(caplog, tmp_path: Path) -> None:
+    content = "[input]\nmode=evdev\nprefer_event_has_keys=KEY_BOGUS\n\n[serial]\nport=/dev/ttyV0\n\n[output]\n"
+    first_file = tmp_path / "first.ini"
+    second_file = tmp_path / "second.ini"
+    first_file.write_text(content, encoding="utf-8")
+    second_file.write_text(content, encoding="utf-8")
+    caplog.set_level(logging.WARNING)
+
+    load_config(first_file)
+    load_config(second_file)
+
+    assert caplog.text.count("KEY_BOGUS") == 2
+
+
+def test_load_config_parses_decimal_vid_pid(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+vendor_id=1256
+product_id=0X7021
+
+[serial]
+port=/dev/ttyV0
+
+[output]
+encoding=utf-8
+""".strip()
+    )
+
+    config = load_config(config_file)
+
+    assert config.input.vendor_id == 1256
+    assert config.input.product_id == 0x7021
+
+
+def test_load_config_rejects_invalid_vid(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+vendor_id=0xZZ
+product_id=0x7021
+
+[serial]
+port=/dev/ttyV0
+
+[output]
+encoding=utf-8
+""".strip()
+    )
+
+    with pytest.raises(ValueError, match="vendor_id must be integer"):
+        load_config(config_file)
+
+
+def test_load_config_raises_file_not_found(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError, match="config file not found"):
+        load_config(tmp_path / "missing.ini")
+
+
+def test_load_config_reuses_cached_config_until_file_changes(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+
+[serial]
+port=/dev/ttyUSB0
+
+[output]
+encoding=utf-8
+""".strip(),
+        encoding="utf-8",
+    )
+
+    first = load_config(config_file)
+    assert load_config(config_file) is first
+
+    config_file.write_text(
+        config_file.read_text(encoding="utf-8").replace("/dev/ttyUSB0", "/dev/ttyUSB10"),
+        encoding="utf-8",
+    )
+
+    reloaded = load_config(config_file)
+    assert reloaded is not first
+    assert reloaded.serial.port == "/dev/ttyUSB10"
+
+
+def test_load_config_interns_output_identifiers(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+
+[serial]
+port=/dev/ttyV0
+
+[output]
+send_mode=PER_CHAR
+terminator_keys=key_enter
+""".strip()
+    )
+
+    config = load_config(config_file)
+
+    assert config.output.send_mode is sys.intern("per_char")
+    assert next(iter(config.output.terminator_keys)) is sys.intern("KEY_ENTER")
+
+
+def test_config_dataclasses_use_slots(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+
+[serial]
+port=/dev/ttyV0
+
+[output]
+""".strip()
+    )
+
+    config = load_config(config_file)
+
+    for section in (config, config.input, config.serial, config.output):
+        assert not hasattr(section, "__dict__")
+
+
+def test_load_config_rejects_invalid_line_end_escape(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+
+[serial]
+port=/dev/ttyV0
+
+[output]
+line_end=\\x0
+line_end_mode=escape
+""".strip()
+    )
+
+    with pytest.raises(ValueError, match="output.line_end"):
+        load_config(config_file)
+
+
+def test_load_config_falls_back_to_configparser_for_interpolation(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+
+[serial]
+base=/dev/ttyV
+port=%(base)s0
+
+[output]
+terminator_keys=KEY_ENTER,
+    KEY_KPENTER
+""".strip()
+    )
+
+    config = load_config(config_file)
+
+    assert config.serial.port == "/dev/ttyV0"
+    assert config.output.terminator_keys == frozenset({"KEY_ENTER", "KEY_KPENTER"})
+
+
+def test_load_config_rejects_broken_interpolation(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+
+[serial]
+port=%(missing)s
+
+[output]
+""".strip()
+    )
+
+    with pytest.raises(ValueError, match="読み取りに失敗"):
+        load_config(config_file)
+
+
+@pytest.mark.parametrize(
+    ("option", "message"),
+    [
+        ("pty_mode=0o660", "serial.pty_mode は 0-7 の数字のみ"),
+        ("pty_mode=689", "serial.pty_mode は 0-7 の数字のみ"),
+        ("write_timeout=fast", "write_timeout must be float"),
+    ],
+)
+def test_load_config_rejects_invalid_numeric_options(tmp_path: Path, option: str, message: str) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        f"""
+[input]
+mode=evdev
+
+[serial]
+port=/dev/ttyV0
+{option}
+
+[output]
+""".strip()
+    )
+
+    with pytest.raises(ValueError, match=message):
+        load_config(config_file)
+
+
+@pytest.mark.parametrize(("value", "expected"), [("O", "O"), ("mark", "M"), (" Space ", "S")])
+def test_load_config_accepts_parity_letters_and_words(tmp_path: Path, value: str, expected: str) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        f"""
+[input]
+mode=evdev
+
+[serial]
+port=/dev/ttyV0
+parity={value}
+
+[output]
+""".strip()
+    )
+
+    assert load_config(config_file).serial.parity == expected
+
+
+def test_load_config_accepts_utf8_bom(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_bytes(
+        "\ufeff[input]\nmode=evdev\n\n[serial]\nport=/dev/ttyV0\n\n[output]\n".encode("utf-8")
+    )
+
+    assert load_config(config_file).serial.port == "/dev/ttyV0"
+
+
+def test_load_config_rejects_zero_padded_decimal_vid(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+vendor_id=04660
+product_id=0x0001
+
+[serial]
+port=/dev/ttyV0
+
+[output]
+""".strip()
+    )
+
+    with pytest.raises(ValueError, match="vendor_id must be integer"):
+        load_config(config_file)
+
+
+def test_load_config_reuses_config_for_identical_rewrite(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    content = "[input]\nmode=evdev\n\n[serial]\nport=/dev/ttyRewrite0\n\n[output]\n"
+    config_file.write_text(content, encoding="utf-8")
+    first = load_config(config_file)
+
+    config_file.write_text(content, encoding="utf-8")
+    stat_result = config_file.stat()
+    os.utime(config_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+
+    assert load_config(config_file) is first
+
+
+def test_load_config_rereads_same_size_rewrite_within_mtime_tick(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[input]\nmode=evdev\n\n[serial]\nport=/dev/ttyOld0\n\n[output]\n", encoding="utf-8")
+    stat_result = config_file.stat()
+    assert load_config(config_file).serial.port == "/dev/ttyOld0"
+
+    config_file.write_text("[input]\nmode=evdev\n\n[serial]\nport=/dev/ttyNew0\n\n[output]\n", encoding="utf-8")
+    os.utime(config_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+
+    assert load_config(config_file).serial.port == "/dev/ttyNew0"
+
+
+def test_load_config_warns_again_when_reusing_parsed_config(caplog, tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        "[input]\nmode=evdev\nprefer_event_has_keys=KEY_BOGUS\n\n[serial]\nport=/dev/ttyV0\n\n[output]\n",
+        encoding="utf-8",
+    )
+    caplog.set_level(logging.WARNING)
+
+    first = load_config(config_file)
+    assert load_config(config_file) is first
+
+    assert caplog.text.count("KEY_BOGUS") == 2
+
+
+def test_load_config_lists_missing_sections_in_definition_order(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[input]\nmode=evdev\n")
+
+    with pytest.raises(ValueError, match="必要なセクションがありません: serial, output$"):
+        load_config(config_file)
+
+
+def test_load_config_treats_blank_key_list_as_empty(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+prefer_event_has_keys= , ,
+
+[serial]
+port=/dev/ttyV0
+
+[output]
+terminator_keys=
+""".strip()
+    )
+
+    config = load_config(config_file)
+
+    assert config.input.prefer_event_has_keys == frozenset()
+    assert config.output.terminator_keys == frozenset()
+
+
+def test_load_config_rejects_negative_idle_timeout(tmp_path: Path) -> None:
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(
+        """
+[input]
+mode=evdev
+
+[serial]
+port=/dev/ttyV0
+
+[output]
+idle_timeout_seconds=-0.1
+""".strip()
+    )
+
+    with pytest.raises(ValueError, match="output.idle_timeout_seconds は 0 以上の値を指定してください。"):
+        load_config(config_file)
@@ -1,4 +1,4 @@
-from key2ser.keymap import DEFAULT_KEYMAP
+from key2ser.keymap import DEFAULT_KEYMAP, KeyMapper
 
 
 def test_keymap_maps_letters_with_shift() -> None:
@@ -18,3 +18,18 @@ def test_keymap_returns_none_for_unknown_key() -> None:
 def test_keymap_maps_kana_mode() -> None:
     assert DEFAULT_KEYMAP.map_keycode("KEY_A", shift=False, kana=True) == "ﾁ"
     assert DEFAULT_KEYMAP.map_keycode("KEY_7", shift=True, kana=True) == "ｬ"
+
+
+def test_keymap_applies_fallback_order() -> None:
+    keymap = KeyMapper(
+        unshifted={"KEY_A": "a", "KEY_B": "b", "KEY_C": "c"},
+        shifted={"KEY_A": "A", "KEY_B": ""},
+        kana_unshifted={"KEY_A": "ﾁ"},
+        kana_shifted={"KEY_C": "ｯ"},
+    )
+
+    assert keymap.map_keycode("KEY_B", shift=True) == "b"
+    assert keymap.map_keycode("KEY_A", shift=True, kana=True) == "ﾁ"
+    assert keymap.map_keycode("KEY_B", shift=True, kana=True) == "b"
+    assert keymap.map_keycode("KEY_C", shift=True, kana=True) == "ｯ"
+    assert keymap.map_keycode("KEY_C", shift=False, kana=True) == "c"
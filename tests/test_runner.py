@@ -2,14 +2,19 @@ from __future__ import annotations
 
 from dataclasses import replace
 import errno
+import os
+import pty
+import select
 import sys
+import threading
+import time
+import tty
 import types
 
 import pytest
 
 evdev_stub = types.ModuleType("evdev")
 evdev_stub.InputDevice = object
-evdev_stub.categorize = lambda event: None
 evdev_stub.ecodes = types.SimpleNamespace(EV_KEY=1)
 evdev_stub.list_devices = lambda: []
 sys.modules.setdefault("evdev", evdev_stub)
@@ -140,6 +145,28 @@ def test_runner_on_enter_unchanged() -> None:
     assert payload == "a\r\n"
 
 
+def test_runner_backspace_removes_last_buffered_char() -> None:
+    state = runner.BufferState()
+    state.text = "12"
+
+    def press_backspace() -> None:
+        runner._handle_key_down(
+            "KEY_BACKSPACE",
+            state,
+            runner.DEFAULT_KEYMAP,
+            "\r\n",
+            DEFAULT_TERMINATOR_KEYS,
+            True,
+            "on_enter",
+        )
+
+    press_backspace()
+    assert state.text == "1"
+    press_backspace()
+    press_backspace()
+    assert state.text == ""
+
+
 def test_runner_on_kpenter_terminates() -> None:
     state = runner.BufferState()
 
@@ -157,6 +184,57 @@ def test_runner_on_kpenter_terminates() -> None:
     assert payload == "123\r\n"
 
 
+def test_buffer_state_uses_slots() -> None:
+    state = runner.BufferState()
+
+    assert not hasattr(state, "__dict__")
+    state.text = "ab"
+    assert state.chars == ["a", "b"]
+
+
+def test_shift_stays_active_until_both_shift_keys_are_released() -> None:
+    state = runner.BufferState()
+
+    for keycode in ("KEY_LEFTSHIFT", "KEY_RIGHTSHIFT"):
+        runner._handle_key_down(keycode, state, runner.DEFAULT_KEYMAP, "\r\n", DEFAULT_TERMINATOR_KEYS, True, "on_enter")
+    runner._handle_key_up("KEY_LEFTSHIFT", state)
+    assert state.shift_active is True
+
+    runner._handle_key_up("KEY_A", state)
+    runner._handle_key_up("KEY_RIGHTSHIFT", state)
+    assert state.shift_active is False
+
+
+def test_build_key_dispatch_keeps_special_key_precedence() -> None:
+    dispatch = runner._build_key_dispatch(frozenset({"KEY_LEFTSHIFT", "KEY_ENTER"}), "on_enter")
+
+    assert dispatch["KEY_LEFTSHIFT"] is runner._on_shift_down
+    assert dispatch["KEY_ENTER"] is runner._on_terminator
+    assert dispatch["KEY_BACKSPACE"] is runner._on_backspace
+    assert "KEY_A" not in dispatch
+    assert "KEY_ENTER" not in runner._build_key_dispatch(frozenset({"KEY_ENTER"}), "per_char")
+
+
+def test_create_pty_symlink_replaces_existing_link(tmp_path) -> None:
+    link = tmp_path / "ttyV0"
+    link.symlink_to(tmp_path / "missing")
+    serial_config = replace(_default_serial_config(), pty_link=str(link))
+
+    path, created = runner._create_pty_symlink(serial_config, "/dev/pts/9")
+
+    assert (path, created) == (link, True)
+    assert os.readlink(link) == "/dev/pts/9"
+
+
+def test_create_pty_symlink_rejects_regular_file(tmp_path) -> None:
+    link = tmp_path / "ttyV0"
+    link.write_text("")
+    serial_config = replace(_default_serial_config(), pty_link=str(link))
+
+    with pytest.raises(runner.SerialConnectionError, match="既に存在しています"):
+        runner._create_pty_symlink(serial_config, "/dev/pts/9")
+
+
 def test_open_input_device_handles_permission_error(monkeypatch, tmp_path) -> None:
     device_path = tmp_path / "event0"
     device_path.write_text("dummy")
@@ -181,6 +259,23 @@ def test_open_input_device_handles_permission_error(monkeypatch, tmp_path) -> No
         runner.open_input_device(config)
 
 
+def test_open_input_device_reports_missing_path(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(runner, "InputDevice", lambda path: os.close(os.open(path, os.O_RDONLY)))
+    config = InputConfig(
+        mode="evdev",
+        device=str(tmp_path / "event9"),
+        vendor_id=None,
+        product_id=None,
+        device_name_contains=None,
+        prefer_event_has_keys=DEFAULT_PREFERRED_INPUT_KEYS,
+        grab=False,
+        reconnect_interval_seconds=0,
+    )
+
+    with pytest.raises(runner.DeviceNotFoundError, match="input.device が存在しません"):
+        runner.open_input_device(config)
+
+
 def test_open_input_device_handles_list_error(monkeypatch) -> None:
     def raise_list_error():
         raise OSError("list error")
@@ -288,7 +383,7 @@ def test_select_device_by_vid_pid_closes_unmatched_devices(monkeypatch) -> None:
             vendor_id=0x1234,
             product_id=0x5678,
             device_name_contains=None,
-            prefer_event_has_keys=(),
+            prefer_event_has_keys=frozenset(),
             grab=False,
             reconnect_interval_seconds=0,
         ),
@@ -333,7 +428,7 @@ def test_select_device_by_vid_pid_closes_multiple_matches(monkeypatch) -> None:
                 vendor_id=0x1234,
                 product_id=0x5678,
                 device_name_contains=None,
-                prefer_event_has_keys=(),
+                prefer_event_has_keys=frozenset(),
                 grab=False,
                 reconnect_interval_seconds=0,
             ),
@@ -365,6 +460,7 @@ def test_select_device_by_vid_pid_prefers_matching_keys(monkeypatch) -> None:
             self.closed = True
 
     monkeypatch.setattr(runner.ecodes, "KEY_ENTER", 28, raising=False)
+    runner._resolve_ecodes.cache_clear()
 
     devices = {
         "/dev/input/event0": DummyDevice("/dev/input/event0", has_keys=False),
@@ -382,7 +478,7 @@ def test_select_device_by_vid_pid_prefers_matching_keys(monkeypatch) -> None:
         vendor_id=0x1234,
         product_id=0x5678,
         device_name_contains=None,
-        prefer_event_has_keys=("KEY_ENTER",),
+        prefer_event_has_keys=frozenset({"KEY_ENTER"}),
         grab=False,
         reconnect_interval_seconds=0,
     )
@@ -426,7 +522,7 @@ def test_select_device_by_vid_pid_prefers_name_hint(monkeypatch) -> None:
         vendor_id=0x1234,
         product_id=0x5678,
         device_name_contains="scanner",
-        prefer_event_has_keys=(),
+        prefer_event_has_keys=frozenset(),
         grab=False,
         reconnect_interval_seconds=0,
     )
@@ -930,6 +1026,14 @@ def test_send_payload_with_dedup_suppresses_duplicate(monkeypatch) -> None:
     assert port.writes == [b"payload"]
 
 
+def test_should_suppress_duplicate_rejects_same_length_payload() -> None:
+    state = runner.BufferState(last_sent_payload="ABC123", last_sent_hash=hash("ABC123"), last_sent_time=10.0)
+
+    assert runner._should_suppress_duplicate(state, "ABC124", dedup_window_seconds=0.2, now=10.1) is False
+    assert runner._should_suppress_duplicate(state, "ABC123", dedup_window_seconds=0.2, now=10.1) is True
+    assert runner._should_suppress_duplicate(state, "ABC123", dedup_window_seconds=0.2, now=10.3) is False
+
+
 def test_send_payload_with_dedup_allows_after_window(monkeypatch) -> None:
     class DummyPort:
         def __init__(self) -> None:
@@ -1082,12 +1186,357 @@ def test_send_payload_with_timing_retries_short_write(monkeypatch) -> None:
     assert port.writes == [b"a"]
 
 
+class _RecordingPort:
+    def __init__(self) -> None:
+        self.writes: list[bytes] = []
+        self.flushed = False
+
+    def write(self, data: bytes) -> int:
+        self.writes.append(data)
+        return len(data)
+
+    def flush(self) -> None:
+        self.flushed = True
+
+
+def test_send_payload_with_timing_batches_per_millisecond(monkeypatch) -> None:
+    port = _RecordingPort()
+    sleeps: list[float] = []
+
+    monkeypatch.setattr(runner.time, "monotonic", lambda: 0.0)
+    monkeypatch.setattr(runner.time, "sleep", sleeps.append)
+
+    runner._send_payload_with_timing(
+        port,
+        "x" * 25,
+        encoding="utf-8",
+        encoding_errors="strict",
+        serial_config=replace(_default_serial_config(), baudrate=115200, emulate_timing=True),
+    )
+
+    # 115200bps 8N1 は1バイト約87マイクロ秒のため、1ミリ秒分の11バイトずつ書き込む。
+    assert [len(chunk) for chunk in port.writes] == [11, 11, 3]
+    assert len(sleeps) == 3
+    assert port.flushed is True
+
+
+def test_send_payload_with_timing_writes_hardware_port_at_once(monkeypatch) -> None:
+    port = _RecordingPort()
+
+    monkeypatch.setattr(runner, "_is_hardware_serial", lambda _port: True)
+    monkeypatch.setattr(runner.time, "sleep", lambda _seconds: pytest.fail("sleep should not be called"))
+
+    runner._send_payload_with_timing(
+        port,
+        "abc",
+        encoding="utf-8",
+        encoding_errors="strict",
+        serial_config=replace(_default_serial_config(), emulate_timing=True),
+    )
+
+    assert port.writes == [b"abc"]
+    assert port.flushed is True
+
+
+def test_send_payload_with_timing_reuses_hardware_check_of_handle(monkeypatch) -> None:
+    port = _RecordingPort()
+    handle = runner.SerialPortHandle(port=port, display_port="/dev/ttyS0")
+    handle.is_hardware = True
+
+    monkeypatch.setattr(runner, "_is_hardware_serial", lambda _port: pytest.fail("should use cached result"))
+    monkeypatch.setattr(runner.time, "sleep", lambda _seconds: pytest.fail("sleep should not be called"))
+
+    runner._send_payload_with_timing(
+        handle,
+        "abc",
+        encoding="utf-8",
+        encoding_errors="strict",
+        serial_config=replace(_default_serial_config(), emulate_timing=True),
+    )
+
+    assert port.writes == [b"abc"]
+    assert port.flushed is True
+
+
+def test_send_payload_with_dedup_skips_drain_for_per_char() -> None:
+    port = _RecordingPort()
+
+    runner._send_payload_with_dedup(
+        port,
+        "a",
+        state=runner.BufferState(),
+        send_mode="per_char",
+        encoding="utf-8",
+        encoding_errors="strict",
+        dedup_window_seconds=0.2,
+        serial_config=_default_serial_config(),
+    )
+    assert port.writes == [b"a"]
+    assert port.flushed is False
+
+    runner._send_payload_with_dedup(
+        port,
+        "ab\r\n",
+        state=runner.BufferState(),
+        send_mode="on_enter",
+        encoding="utf-8",
+        encoding_errors="strict",
+        dedup_window_seconds=0.2,
+        serial_config=_default_serial_config(),
+    )
+    assert port.flushed is True
+
+
+def test_serial_writer_thread_writes_in_background() -> None:
+    port = _RecordingPort()
+
+    with runner._SerialWriterThread(port) as writer:
+        assert writer.write(b"ab") == 2
+        writer.write(b"c")
+        writer.flush()
+
+    assert b"".join(port.writes) == b"abc"
+    assert port.flushed is True
+
+
+def test_serial_writer_thread_signals_write_errors_without_next_send(caplog) -> None:
+    class FailingPort:
+        def write(self, data: bytes) -> int:
+            raise OSError(errno.EIO, "I/O error")
+
+        def flush(self) -> None:
+            return None
+
+    writer = runner._SerialWriterThread(FailingPort())
+    writer.__enter__()
+    writer.write(b"a")
+    # 次の送信を待たずに、eventfd が読み取り可能になって失敗を知らせる。
+    readable, _, _ = select.select([writer.error_fd], [], [], 1.0)
+    assert readable == [writer.error_fd]
+    with pytest.raises(runner.SerialConnectionError) as excinfo:
+        writer.raise_pending_error()
+    assert isinstance(excinfo.value.__cause__, OSError)
+    with pytest.raises(runner.SerialConnectionError):
+        writer.write(b"b")
+    writer.__exit__(runner.SerialConnectionError, None, None)
+
+    assert not writer._thread.is_alive()
+    assert "シリアルへの書き込みに失敗しました" in caplog.text
+
+
+def test_serial_writer_thread_survives_unexpected_errors() -> None:
+    class BrokenPort:
+        def write(self, data: bytes) -> int:
+            raise ValueError("unexpected")
+
+        def flush(self) -> None:
+            return None
+
+    writer = runner._SerialWriterThread(BrokenPort())
+    writer.__enter__()
+    writer.write(b"a")
+    readable, _, _ = select.select([writer.error_fd], [], [], 1.0)
+    assert readable == [writer.error_fd]
+    assert writer._thread.is_alive()
+    with pytest.raises(runner.SerialConnectionError) as excinfo:
+        writer.flush()
+    assert isinstance(excinfo.value.__cause__, ValueError)
+    with pytest.raises(runner.SerialConnectionError):
+        writer.__exit__(None, None, None)
+    assert not writer._thread.is_alive()
+
+
+def test_serial_writer_thread_raises_pending_error_on_exit() -> None:
+    class FailingPort:
+        def write(self, data: bytes) -> int:
+            raise OSError(errno.EIO, "I/O error")
+
+        def flush(self) -> None:
+            return None
+
+    with pytest.raises(runner.SerialConnectionError):
+        with runner._SerialWriterThread(FailingPort()) as writer:
+            writer.write(b"a")
+
+
+def test_serial_writer_thread_applies_backpressure(monkeypatch) -> None:
+    release = threading.Event()
+    started = threading.Event()
+    port = _RecordingPort()
+    record = port.write
+
+    def blocking_write(data: bytes) -> int:
+        started.set()
+        release.wait()
+        return record(data)
+
+    port.write = blocking_write
+    monkeypatch.setattr(runner, "_WRITER_QUEUE_SIZE", 1)
+    with runner._SerialWriterThread(port) as writer:
+        writer.write(b"a")
+        assert started.wait(1.0)
+        writer.write(b"b")
+
+        # 書き込みが止まっている間はキューが埋まり、呼び出し側を待たせる。
+        blocked = threading.Thread(target=writer.write, args=(b"c",))
+        blocked.start()
+        blocked.join(0.05)
+        assert blocked.is_alive()
+
+        release.set()
+        blocked.join(1.0)
+        assert not blocked.is_alive()
+
+    assert b"".join(port.writes) == b"abc"
+
+
+def test_serial_writer_thread_cancels_stalled_write_on_exit(monkeypatch, caplog) -> None:
+    release = threading.Event()
+    started = threading.Event()
+    port = _RecordingPort()
+    record = port.write
+
+    def stalled_write(data: bytes) -> int:
+        started.set()
+        release.wait()
+        return record(data)
+
+    port.write = stalled_write
+    # pyserial の cancel_write と同様に、止まっている書き込みを戻らせる。
+    port.cancel_write = release.set
+    monkeypatch.setattr(runner, "_WRITER_JOIN_SECONDS", 0.05)
+    writer = runner._SerialWriterThread(port)
+    writer.__enter__()
+    writer.write(b"a")
+    assert started.wait(1.0)
+    writer.write(b"b")
+
+    writer.__exit__(None, None, None)
+
+    assert not writer._thread.is_alive()
+    assert release.is_set()
+    # 打ち切り後に残っていたデータは送らない。
+    assert port.writes == [b"a"]
+    assert "未送信のデータを破棄します" in caplog.text
+
+
+def test_start_serial_writer_uses_thread_only_for_per_char() -> None:
+    port = _RecordingPort()
+    serial_config = _default_serial_config()
+
+    with runner._start_serial_writer(port, serial_config, "on_enter") as writer:
+        assert writer is port
+    with runner._start_serial_writer(port, serial_config, "idle_timeout") as writer:
+        assert writer is port
+    with runner._start_serial_writer(port, serial_config, "per_char") as writer:
+        assert isinstance(writer, runner._SerialWriterThread)
+
+
+def test_start_serial_writer_keeps_timing_emulation_synchronous() -> None:
+    port = _RecordingPort()
+    serial_config = replace(_default_serial_config(), emulate_timing=True)
+
+    with runner._start_serial_writer(port, serial_config, "per_char") as writer:
+        assert writer is port
+
+
+def test_is_hardware_serial_treats_pty_as_virtual() -> None:
+    master, slave = pty.openpty()
+    try:
+        port = types.SimpleNamespace(fileno=lambda: slave)
+        assert runner._is_hardware_serial(port) is False
+        assert runner._is_hardware_serial(object()) is False
+        assert runner.SerialPortHandle(port=port, display_port="/dev/ttyV0").is_hardware is False
+    finally:
+        os.close(master)
+        os.close(slave)
+
+
+@pytest.mark.parametrize(
+    ("name", "expected"),
+    [
+        ("/dev/ttyS0", True),
+        ("/dev/ttyUSB0", True),
+        ("/dev/ttyACM0", True),
+        ("/dev/ttyAMA0", True),
+        ("/dev/rfcomm0", False),
+        ("/dev/ttyGS0", False),
+        ("/dev/tnt0", False),
+        ("/dev/pts/3", False),
+    ],
+)
+def test_is_hardware_serial_accepts_only_known_uarts(monkeypatch, name: str, expected: bool) -> None:
+    monkeypatch.setattr(runner.os, "ttyname", lambda _fd: name)
+    port = types.SimpleNamespace(fileno=lambda: 3)
+
+    assert runner._is_hardware_serial(port) is expected
+
+
+def test_open_serial_port_logs_timing_mode(monkeypatch, caplog) -> None:
+    class DummyPort:
+        def fileno(self) -> int:
+            return 3
+
+    monkeypatch.setattr(runner.serial, "Serial", lambda **kwargs: DummyPort())
+    monkeypatch.setattr(runner.os, "ttyname", lambda _fd: "/dev/rfcomm0")
+    caplog.set_level("INFO")
+
+    config = AppConfig(
+        input=InputConfig(
+            mode="evdev",
+            device="/dev/input/event0",
+            vendor_id=None,
+            product_id=None,
+            device_name_contains=None,
+            prefer_event_has_keys=DEFAULT_PREFERRED_INPUT_KEYS,
+            grab=False,
+            reconnect_interval_seconds=0,
+        ),
+        serial=replace(_default_serial_config(), port="/dev/rfcomm0", emulate_timing=True),
+        output=OutputConfig(
+            encoding="utf-8",
+            encoding_errors="strict",
+            line_end="\r\n",
+            line_end_mode="literal",
+            terminator_keys=DEFAULT_TERMINATOR_KEYS,
+            send_on_enter=True,
+            send_mode="on_enter",
+            idle_timeout_seconds=0.5,
+            dedup_window_seconds=0.2,
+        ),
+    )
+
+    handle = runner._open_serial_port(config)
+
+    assert handle.is_hardware is False
+    assert "ソフトウェアで送信間隔を制御します" in caplog.text
+
+
+def test_encode_payload_reuses_cached_bytes_and_keeps_errors() -> None:
+    first = runner._encode_payload("ア", "shift_jis", errors="strict")
+    assert runner._encode_payload("ア", "shift_jis", errors="strict") is first
+
+    for _ in range(2):
+        with pytest.raises(runner.PayloadEncodeError):
+            runner._encode_payload("€", "ascii", errors="strict")
+
+
+def test_encode_payload_does_not_cache_multi_char_payloads() -> None:
+    runner._encode_cached.cache_clear()
+
+    assert runner._encode_payload("0123456789", "utf-8", errors="strict") == b"0123456789"
+    assert runner._encode_cached.cache_info().currsize == 0
+
+    runner._encode_payload("a", "utf-8", errors="strict")
+    assert runner._encode_cached.cache_info().currsize == 1
+
+
 def test_encode_payload_handles_invalid_encoding() -> None:
     with pytest.raises(ValueError, match="output.encoding に未対応の文字コードが指定されています。"):
         runner._encode_payload("a", "invalid-encoding", errors="strict")
 
 
-def test_run_event_loop_default_handles_read_loop_error(monkeypatch) -> None:
+def test_run_event_loop_default_handles_register_error(monkeypatch) -> None:
     class DummyPort:
         display_port = "/dev/ttyV0"
 
@@ -1100,7 +1549,7 @@ def test_run_event_loop_default_handles_read_loop_error(monkeypatch) -> None:
     class DummyDevice:
         path = "/dev/input/event0"
 
-        def read_loop(self):
+        def fileno(self) -> int:
             raise OSError("read error")
 
     monkeypatch.setattr(runner, "_open_serial_port", lambda config: DummyPort())
@@ -1144,16 +1593,28 @@ def test_run_event_loop_default_handles_read_error(monkeypatch) -> None:
         def __exit__(self, exc_type, exc, tb) -> bool:
             return False
 
+    read_fd, write_fd = os.pipe()
+
     class DummyDevice:
         path = "/dev/input/event0"
 
-        def read_loop(self):
-            yield "event"
+        def fileno(self) -> int:
+            return read_fd
+
+    reads = 0
+
+    def fake_read_input_events(fd: int):
+        nonlocal reads
+        os.read(fd, 16)
+        reads += 1
+        if reads > 1:
             raise OSError("read error")
+        return [(0, 0, runner.ecodes.EV_KEY, 30, 1)]
 
     monkeypatch.setattr(runner, "_open_serial_port", lambda config: DummyPort())
     monkeypatch.setattr(runner, "_log_device_info", lambda device, serial_port: None)
-    monkeypatch.setattr(runner, "_process_key_event", lambda *args, **kwargs: None)
+    monkeypatch.setattr(runner, "_read_input_events", fake_read_input_events)
+    monkeypatch.setattr(runner, "_process_raw_event", lambda *args, **kwargs: os.write(write_fd, b"x"))
 
     config = AppConfig(
         input=InputConfig(
@@ -1180,8 +1641,13 @@ def test_run_event_loop_default_handles_read_error(monkeypatch) -> None:
         ),
     )
 
-    with pytest.raises(runner.DeviceAccessError, match="入力デバイスの読み取りに失敗しました。"):
-        runner._run_event_loop_default(config, DummyDevice(), keymap=runner.DEFAULT_KEYMAP)
+    os.write(write_fd, b"x")
+    try:
+        with pytest.raises(runner.DeviceAccessError, match="入力デバイスの読み取りに失敗しました。"):
+            runner._run_event_loop_default(config, DummyDevice(), keymap=runner.DEFAULT_KEYMAP)
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
 
 
 def test_run_event_loop_default_sends_on_enter(monkeypatch) -> None:
@@ -1202,32 +1668,18 @@ def test_run_event_loop_default_sends_on_enter(monkeypatch) -> None:
         def __exit__(self, exc_type, exc, tb) -> bool:
             return False
 
-    class DummyKeyEvent:
-        key_down = 1
-        key_up = 0
-
-        def __init__(self, keycode: str, keystate: int) -> None:
-            self.keycode = keycode
-            self.keystate = keystate
-
-    class DummyEvent:
-        def __init__(self, keycode: str, keystate: int) -> None:
-            self.type = runner.ecodes.EV_KEY
-            self.keycode = keycode
-            self.keystate = keystate
+    read_fd, write_fd = os.pipe()
 
     class DummyDevice:
         path = "/dev/input/event0"
 
-        def read_loop(self):
-            yield DummyEvent("KEY_A", DummyKeyEvent.key_down)
-            yield DummyEvent("KEY_ENTER", DummyKeyEvent.key_down)
+        def fileno(self) -> int:
+            return read_fd
 
     dummy_port = DummyPort()
 
     monkeypatch.setattr(runner, "_open_serial_port", lambda config: dummy_port)
     monkeypatch.setattr(runner, "_log_device_info", lambda device, serial_port: None)
-    monkeypatch.setattr(runner, "categorize", lambda event: DummyKeyEvent(event.keycode, event.keystate))
 
     config = AppConfig(
         input=InputConfig(
@@ -1254,11 +1706,148 @@ def test_run_event_loop_default_sends_on_enter(monkeypatch) -> None:
         ),
     )
 
-    runner._run_event_loop_default(config, DummyDevice(), keymap=runner.DEFAULT_KEYMAP)
+    monkeypatch.setattr(runner, "_CODE_TO_KEYCODES", {30: ("KEY_A",), 28: ("KEY_ENTER",)})
+    events = [
+        (0, 0, runner.ecodes.EV_KEY, 30, 1),
+        (0, 0, 0, 0, 0),
+        (0, 0, runner.ecodes.EV_KEY, 30, 0),
+        (0, 0, runner.ecodes.EV_KEY, 28, 1),
+    ]
+    os.write(write_fd, b"".join(runner._INPUT_EVENT.pack(*event) for event in events))
+    # 書き込み側を閉じてEOFを切断として扱わせ、ループを終了させる。
+    os.close(write_fd)
+    try:
+        with pytest.raises(runner.DeviceAccessError, match="入力デバイスの読み取りに失敗しました。"):
+            runner._run_event_loop_default(config, DummyDevice(), keymap=runner.DEFAULT_KEYMAP)
+    finally:
+        os.close(read_fd)
 
     assert dummy_port.writes == [b"a\r\n"]
 
 
+def test_run_event_loop_default_coalesces_per_char_writes(monkeypatch) -> None:
+    read_fd, write_fd = os.pipe()
+    port = _RecordingPort()
+    port.display_port = "/dev/ttyV0"
+
+    class DummyPortContext:
+        def __enter__(self):
+            return port
+
+        def __exit__(self, exc_type, exc, tb) -> bool:
+            return False
+
+    class DummyDevice:
+        path = "/dev/input/event0"
+
+        def fileno(self) -> int:
+            return read_fd
+
+    monkeypatch.setattr(runner, "_open_serial_port", lambda config: DummyPortContext())
+    monkeypatch.setattr(runner, "_log_device_info", lambda device, serial_port: None)
+    monkeypatch.setattr(runner, "_CODE_TO_KEYCODES", {30: ("KEY_A",), 48: ("KEY_B",)})
+
+    config = AppConfig(
+        input=InputConfig(
+            mode="evdev",
+            device="/dev/input/event0",
+            vendor_id=None,
+            product_id=None,
+            device_name_contains=None,
+            prefer_event_has_keys=DEFAULT_PREFERRED_INPUT_KEYS,
+            grab=False,
+            reconnect_interval_seconds=0,
+        ),
+        serial=_default_serial_config(),
+        output=OutputConfig(
+            encoding="utf-8",
+            encoding_errors="strict",
+            line_end="\r\n",
+            line_end_mode="literal",
+            terminator_keys=DEFAULT_TERMINATOR_KEYS,
+            send_on_enter=True,
+            send_mode="per_char",
+            idle_timeout_seconds=0.5,
+            dedup_window_seconds=0.2,
+        ),
+    )
+
+    events = [(0, 0, runner.ecodes.EV_KEY, 30, 1), (0, 0, runner.ecodes.EV_KEY, 48, 1)]
+    os.write(write_fd, b"".join(runner._INPUT_EVENT.pack(*event) for event in events))
+    os.close(write_fd)
+    try:
+        with pytest.raises(runner.DeviceAccessError, match="入力デバイスの読み取りに失敗しました。"):
+            runner._run_event_loop_default(config, DummyDevice(), keymap=runner.DEFAULT_KEYMAP)
+    finally:
+        os.close(read_fd)
+
+    assert port.writes == [b"ab"]
+    assert port.flushed is False
+
+
+def test_run_event_loop_default_reports_per_char_write_error_without_next_key(monkeypatch) -> None:
+    read_fd, write_fd = os.pipe()
+
+    class FailingPort:
+        display_port = "/dev/ttyV0"
+
+        def write(self, data: bytes) -> int:
+            raise OSError(errno.EIO, "I/O error")
+
+        def flush(self) -> None:
+            return None
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb) -> bool:
+            return False
+
+    class DummyDevice:
+        path = "/dev/input/event0"
+
+        def fileno(self) -> int:
+            return read_fd
+
+    monkeypatch.setattr(runner, "_open_serial_port", lambda config: FailingPort())
+    monkeypatch.setattr(runner, "_log_device_info", lambda device, serial_port: None)
+    monkeypatch.setattr(runner, "_CODE_TO_KEYCODES", {30: ("KEY_A",)})
+
+    config = AppConfig(
+        input=InputConfig(
+            mode="evdev",
+            device="/dev/input/event0",
+            vendor_id=None,
+            product_id=None,
+            device_name_contains=None,
+            prefer_event_has_keys=DEFAULT_PREFERRED_INPUT_KEYS,
+            grab=False,
+            reconnect_interval_seconds=0,
+        ),
+        serial=_default_serial_config(),
+        output=OutputConfig(
+            encoding="utf-8",
+            encoding_errors="strict",
+            line_end="\r\n",
+            line_end_mode="literal",
+            terminator_keys=DEFAULT_TERMINATOR_KEYS,
+            send_on_enter=True,
+            send_mode="per_char",
+            idle_timeout_seconds=0.5,
+            dedup_window_seconds=0.2,
+        ),
+    )
+
+    # 書き込み側は開いたままにし、次の入力が届かない状態で失敗が伝わることを確かめる。
+    os.write(write_fd, runner._INPUT_EVENT.pack(0, 0, runner.ecodes.EV_KEY, 30, 1))
+    try:
+        with pytest.raises(runner.SerialConnectionError):
+            runner._run_event_loop_default(config, DummyDevice(), keymap=runner.DEFAULT_KEYMAP)
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+
 def test_run_event_loop_retries_on_serial_error(monkeypatch) -> None:
     class DummyDevice:
         path = "/dev/input/event0"
@@ -1348,3 +1937,296 @@ def test_run_event_loop_raises_when_reconnect_disabled(monkeypatch) -> None:
 
     with pytest.raises(runner.DeviceNotFoundError, match="not found"):
         runner.run_event_loop(config)
+
+
+def _read_exact(fd: int, size: int, timeout: float = 2.0) -> bytes:
+    data = b""
+    while len(data) < size:
+        readable, _, _ = select.select([fd], [], [], timeout)
+        if not readable:
+            break
+        data += os.read(fd, size - len(data))
+    return data
+
+
+def test_virtual_pty_bridge_forwards_data_both_ways() -> None:
+    master_a, slave_a = pty.openpty()
+    master_b, slave_b = pty.openpty()
+    for fd in (slave_a, slave_b):
+        tty.setraw(fd)
+    bridge = runner.VirtualPtyBridge(master_a, master_b)
+    bridge.start()
+    try:
+        os.write(slave_a, b"hello")
+        assert _read_exact(slave_b, 5) == b"hello"
+        os.write(slave_b, b"ok")
+        assert _read_exact(slave_a, 2) == b"ok"
+    finally:
+        bridge.close()
+        os.close(slave_a)
+        os.close(slave_b)
+
+
+def test_virtual_pty_bridge_close_wakes_idle_thread() -> None:
+    master_a, slave_a = pty.openpty()
+    master_b, slave_b = pty.openpty()
+    bridge = runner.VirtualPtyBridge(master_a, master_b)
+    bridge.start()
+    try:
+        started = time.monotonic()
+        bridge.close()
+        assert time.monotonic() - started < 0.4
+        assert not bridge._thread.is_alive()
+    finally:
+        os.close(slave_a)
+        os.close(slave_b)
+
+
+def test_virtual_pty_bridge_buffers_bursts_larger_than_pty_queue() -> None:
+    master_a, slave_a = pty.openpty()
+    master_b, slave_b = pty.openpty()
+    for fd in (slave_a, slave_b):
+        tty.setraw(fd)
+    bridge = runner.VirtualPtyBridge(master_a, master_b)
+    bridge.start()
+    payload = bytes(range(256)) * 1024
+    writer = threading.Thread(target=lambda: os.write(slave_a, payload) and None)
+    try:
+        writer.start()
+        received = bytearray()
+        while len(received) < len(payload):
+            chunk = _read_exact(slave_b, min(4096, len(payload) - len(received)))
+            if not chunk:
+                break
+            received += chunk
+        assert bytes(received) == payload
+    finally:
+        writer.join(timeout=2.0)
+        bridge.close()
+        os.close(slave_a)
+        os.close(slave_b)
+
+
+def test_byte_ring_wraps_around_capacity() -> None:
+    ring = runner._ByteRing(8)
+    views = ring.free_views()
+    views[0][:6] = b"abcdef"
+    ring.produce(6)
+    ring.consume(4)
+
+    free = ring.free_views()
+    assert [len(view) for view in free] == [2, 4]
+    free[0][:] = b"gh"
+    free[1][:3] = b"ijk"
+    ring.produce(5)
+
+    assert b"".join(bytes(view) for view in ring.data_views()) == b"efghijk"
+    ring.consume(7)
+    assert len(ring) == 0
+    assert [len(view) for view in ring.free_views()] == [8]
+
+
+def test_process_raw_event_handles_every_alias(monkeypatch) -> None:
+    monkeypatch.setattr(runner, "_CODE_TO_KEYCODES", {30: ("KEY_A", "KEY_B")})
+    state = runner.BufferState()
+    output = OutputConfig(
+        encoding="utf-8",
+        encoding_errors="strict",
+        line_end="\r\n",
+        line_end_mode="literal",
+        terminator_keys=DEFAULT_TERMINATOR_KEYS,
+        send_on_enter=True,
+        send_mode="on_enter",
+        idle_timeout_seconds=0.5,
+        dedup_window_seconds=0.2,
+    )
+
+    runner._process_raw_event(
+        runner.ecodes.EV_KEY,
+        30,
+        1,
+        state=state,
+        keymap=runner.DEFAULT_KEYMAP,
+        output=output,
+        port=None,
+        serial_config=_default_serial_config(),
+    )
+
+    assert state.text == "ab"
+
+
+def test_process_key_event_skips_unknown_code(monkeypatch) -> None:
+    monkeypatch.setattr(runner, "_CODE_TO_KEYCODES", {})
+    monkeypatch.setattr(runner, "_handle_key_down", lambda *args, **kwargs: pytest.fail("unknown code handled"))
+
+    event = types.SimpleNamespace(type=runner.ecodes.EV_KEY, code=0x2FF, value=1)
+
+    runner._process_key_event(
+        event,
+        state=runner.BufferState(),
+        keymap=runner.DEFAULT_KEYMAP,
+        output=None,
+        port=None,
+        serial_config=_default_serial_config(),
+    )
+
+
+def test_build_keycode_table_normalizes_aliases(monkeypatch) -> None:
+    monkeypatch.setattr(
+        runner.ecodes,
+        "keys",
+        {28: "KEY_ENTER", 152: ("KEY_COFFEE", "KEY_SCREENLOCK"), 113: ["KEY_MIN_INTERESTING", "KEY_MUTE"]},
+        raising=False,
+    )
+
+    table = runner._build_keycode_table()
+
+    assert table == {
+        28: ("KEY_ENTER",),
+        152: ("KEY_COFFEE", "KEY_SCREENLOCK"),
+        113: ("KEY_MIN_INTERESTING", "KEY_MUTE"),
+    }
+
+
+def test_run_event_loop_idle_timeout_flushes_after_quiet_period(monkeypatch) -> None:
+    read_fd, write_fd = os.pipe()
+
+    class DummyPort:
+        display_port = "/dev/ttyV0"
+
+        def __init__(self) -> None:
+            self.writes: list[bytes] = []
+
+        def write(self, data: bytes) -> None:
+            self.writes.append(data)
+            # 送信後に書き込み側を閉じ、次の読み取りを切断扱いにしてループを終了させる。
+            os.close(write_fd)
+
+        def flush(self) -> None:
+            return None
+
+        def __enter__(self) -> "DummyPort":
+            return self
+
+        def __exit__(self, exc_type, exc, tb) -> bool:
+            return False
+
+    class DummyDevice:
+        path = "/dev/input/event0"
+
+        def fileno(self) -> int:
+            return read_fd
+
+    dummy_port = DummyPort()
+    monkeypatch.setattr(runner, "_open_serial_port", lambda config: dummy_port)
+    monkeypatch.setattr(runner, "_log_device_info", lambda device, serial_port: None)
+    monkeypatch.setattr(runner, "_CODE_TO_KEYCODES", {30: ("KEY_A",)})
+
+    config = AppConfig(
+        input=InputConfig(
+            mode="evdev",
+            device="/dev/input/event0",
+            vendor_id=None,
+            product_id=None,
+            device_name_contains=None,
+            prefer_event_has_keys=DEFAULT_PREFERRED_INPUT_KEYS,
+            grab=False,
+            reconnect_interval_seconds=0,
+        ),
+        serial=_default_serial_config(),
+        output=OutputConfig(
+            encoding="utf-8",
+            encoding_errors="strict",
+            line_end="\r\n",
+            line_end_mode="literal",
+            terminator_keys=DEFAULT_TERMINATOR_KEYS,
+            send_on_enter=True,
+            send_mode="idle_timeout",
+            idle_timeout_seconds=0.01,
+            dedup_window_seconds=0.2,
+        ),
+    )
+
+    os.write(write_fd, runner._INPUT_EVENT.pack(0, 0, runner.ecodes.EV_KEY, 30, 1))
+    try:
+        with pytest.raises(runner.DeviceAccessError, match="読み取りに失敗しました"):
+            runner._run_event_loop_idle_timeout(config, DummyDevice(), keymap=runner.DEFAULT_KEYMAP)
+    finally:
+        os.close(read_fd)
+
+    assert dummy_port.writes == [b"a\r\n"]
+
+
+def test_read_input_events_drains_bursts_beyond_one_read() -> None:
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    count = runner._INPUT_READ_EVENTS * 2 + 3
+    try:
+        os.write(
+            write_fd,
+            b"".join(runner._INPUT_EVENT.pack(0, 0, runner.ecodes.EV_KEY, 30, index % 2) for index in range(count)),
+        )
+        events = list(runner._read_input_events(read_fd))
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+    assert len(events) == count
+    assert events[-1] == (0, 0, runner.ecodes.EV_KEY, 30, 0)
+
+
+def test_serial_port_handle_binds_write_and_flush() -> None:
+    class DummySerial:
+        def __init__(self) -> None:
+            self.writes: list[bytes] = []
+            self.flushed = False
+            self.baudrate = 9600
+
+        def write(self, data: bytes) -> int:
+            self.writes.append(data)
+            return len(data)
+
+        def flush(self) -> None:
+            self.flushed = True
+
+    port = DummySerial()
+    handle = runner.SerialPortHandle(port=port, display_port="/dev/ttyV0")
+
+    assert "write" in vars(runner.SerialPortHandle)
+    assert handle.write(b"a") == 1
+    handle.flush()
+    assert port.writes == [b"a"]
+    assert port.flushed is True
+    assert handle.baudrate == 9600
+
+
+def test_serial_port_handle_writes_directly_to_fd() -> None:
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+
+    class DummySerial:
+        fd = slave
+        is_open = True
+
+        def write(self, data: bytes) -> int:
+            if not self.is_open:
+                raise runner.serial.SerialException("Attempting to use a port that is not open")
+            pytest.fail("pyserial write should not be called")
+
+        def close(self) -> None:
+            self.is_open = False
+            self.fd = None
+
+    handle = runner.SerialPortHandle(port=DummySerial(), display_port="/dev/ttyV0")
+    try:
+        assert handle.write(b"abc") == 3
+        assert os.read(master, 16) == b"abc"
+        with handle:
+            pass
+        # クローズ後は fd へ直接書き込まず、pyserial のオープン確認に任せる。
+        with pytest.raises(runner.serial.SerialException):
+            handle.write(b"d")
+    finally:
+        os.close(master)
+        os.close(slave)